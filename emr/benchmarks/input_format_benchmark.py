@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+    keywords/ 단계 저장 형식 비교 벤치마크 (JSONL vs 파티셔닝된 Parquet)
+
+    합성 게시글 코퍼스를 두 형식으로 저장한 뒤 파일 크기와
+    이슈화 계산에 필요한 컬럼(keywords, 숫자 컬럼)만 읽어 집계하는 시간을 출력합니다.
+
+    사용법:
+        spark-submit emr/benchmarks/input_format_benchmark.py --posts_per_file 20000 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import pyarrow.parquet as pq
+from pyspark.sql import SparkSession
+import pyspark.sql.functions as F
+from pyspark.sql.functions import col, explode
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "transform"))
+from post_schema import get_spark_schema, to_arrow_table
+
+
+DATA_SOURCES = ["dc", "naver", "bobae", "clien"]
+MODELS = ["아이오닉6", "코나", "g80", "그랜저"]
+WORDS = ["누수", "급발진", "리콜", "배터리", "충전", "소음", "연비", "가격", "옵션", "출고"]
+CRAWL_HOUR = "2024-08-10T14-00-00"
+
+
+def make_post(data_source, model, index):
+    """
+    본문과 댓글이 긴 실제 게시글과 비슷한 크기의 합성 게시글
+    """
+    content = " ".join(random.choices(WORDS, k=random.randint(50, 400)))
+    comments = [
+        {
+            "author": f"user{i}",
+            "content": " ".join(random.choices(WORDS, k=random.randint(3, 30))),
+            "created_at": "2024-08-10 13:00:00",
+            "num_of_comments": 0,
+            "children": [],
+        }
+        for i in range(random.randint(0, 30))
+    ]
+
+    return {
+        "title": " ".join(random.choices(WORDS, k=5)),
+        "content": content,
+        "author": f"author{index}",
+        "created_at": "2024-08-10 13:00:00",
+        "viewed": random.randint(0, 5000),
+        "liked": random.randint(0, 100),
+        "num_of_comments": len(comments),
+        "comments": comments,
+        "model": model,
+        "data_source": data_source,
+        "url": f"https://{data_source}.example.com/{model}/{index}",
+        "sentiment": random.random(),
+        "keywords": random.sample(WORDS, k=random.randint(0, 5)),
+    }
+
+
+def write_corpus(root, posts_per_file):
+    """
+    커뮤니티 x 차종 파일을 JSONL과 Parquet 두 형식으로 저장
+    """
+    jsonl_dir = os.path.join(root, "keywords", CRAWL_HOUR)
+    parquet_root = os.path.join(root, "keywords_parquet")
+    os.makedirs(jsonl_dir)
+
+    for data_source in DATA_SOURCES:
+        for model in MODELS:
+            posts = [make_post(data_source, model, i) for i in range(posts_per_file)]
+            file_name = f"{data_source}_{model}_{CRAWL_HOUR}"
+
+            with open(os.path.join(jsonl_dir, f"{file_name}.jsonl"), "w") as f:
+                for post in posts:
+                    f.write(json.dumps(post, ensure_ascii=False) + "\n")
+
+            parquet_dir = os.path.join(
+                parquet_root,
+                f"crawl_hour={CRAWL_HOUR}",
+                f"data_source={data_source}",
+                f"model={model}",
+            )
+            os.makedirs(parquet_dir)
+            pq.write_table(
+                to_arrow_table(posts, "keywords", exclude=("data_source", "model")),
+                os.path.join(parquet_dir, f"{file_name}.parquet"),
+                compression="snappy",
+            )
+
+    return jsonl_dir, parquet_root
+
+
+def get_size(path):
+    return sum(
+        os.path.getsize(os.path.join(dir_path, file_name))
+        for dir_path, _, file_names in os.walk(path)
+        for file_name in file_names
+    )
+
+
+def aggregate(df):
+    """
+    이슈화 계산과 같은 컬럼만 사용하는 집계
+    """
+    return (
+        df.select(
+            explode(col("keywords")).alias("keyword"),
+            col("viewed").cast("integer").alias("viewed"),
+            col("liked").cast("integer").alias("liked"),
+            col("num_of_comments").cast("integer").alias("num_of_comments"),
+            col("sentiment"),
+        )
+        .groupBy("keyword")
+        .agg(F.sum("viewed"), F.sum("liked"), F.sum("num_of_comments"), F.sum("sentiment"))
+        .collect()
+    )
+
+
+def run(read_df, repeat):
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        aggregate(read_df())
+        elapsed.append(time.perf_counter() - start)
+
+    return min(elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts_per_file", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(0)
+    root = tempfile.mkdtemp(prefix="input_format_benchmark_")
+
+    try:
+        jsonl_dir, parquet_root = write_corpus(root, args.posts_per_file)
+
+        spark = SparkSession.builder.appName("input_format_benchmark").getOrCreate()
+
+        jsonl_schema = get_spark_schema("keywords")
+        parquet_schema = get_spark_schema("keywords", exclude=("data_source", "model"))
+        for name in ["crawl_hour", "data_source", "model"]:
+            parquet_schema = parquet_schema.add(name, "string")
+
+        jsonl_time = run(lambda: spark.read.schema(jsonl_schema).json(jsonl_dir), args.repeat)
+        parquet_time = run(
+            lambda: spark.read.schema(parquet_schema)
+            .option("basePath", parquet_root)
+            .parquet(os.path.join(parquet_root, f"crawl_hour={CRAWL_HOUR}")),
+            args.repeat,
+        )
+
+        jsonl_size = get_size(jsonl_dir)
+        parquet_size = get_size(parquet_root)
+
+        num_posts = len(DATA_SOURCES) * len(MODELS) * args.posts_per_file
+        print(f"posts: {num_posts} ({len(DATA_SOURCES) * len(MODELS)} files)")
+        print(f"jsonl   size: {jsonl_size / 2**20:.1f} MiB, read+aggregate: {jsonl_time:.3f}s")
+        print(f"parquet size: {parquet_size / 2**20:.1f} MiB, read+aggregate: {parquet_time:.3f}s")
+        print(f"size ratio: {jsonl_size / parquet_size:.1f}x, speedup: {jsonl_time / parquet_time:.1f}x")
+
+        spark.stop()
+    finally:
+        shutil.rmtree(root)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+    이슈화 점수 계산 방식 비교 벤치마크
+
+    - 기존: get_issue_score를 Python UDF로 등록해 한 행씩 계산
+    - 변경: get_issue_score_column으로 만든 Spark 컬럼 식 (JVM 내부에서 계산)
+
+    62일 x 24시간 x 키워드 수 크기의 합성 그리드에서 두 방식의 수행 시간과 결과 차이를 출력합니다.
+
+    사용법:
+        spark-submit emr/benchmarks/issue_score_benchmark.py --num_keywords 1000 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from pyspark.sql import SparkSession
+import pyspark.sql.functions as F
+from pyspark.sql.functions import col, udf
+from pyspark.sql.types import DoubleType
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "transform"))
+from issue_score import get_issue_score, get_issue_score_column
+
+
+NUM_HOURS = 62 * 24
+
+
+def make_grid_df(spark, num_keywords, sparsity):
+    """
+    (시간, 키워드) 밀집 그리드 생성, sparsity 비율만큼의 셀은 0으로 채움
+    """
+    grid_df = spark.range(NUM_HOURS * num_keywords).select(
+        (col("id") % NUM_HOURS).alias("hour"),
+        (col("id") / NUM_HOURS).cast("long").alias("keyword"),
+        (F.rand(seed=0) > sparsity).alias("active"),
+    )
+
+    return grid_df.select(
+        "hour",
+        "keyword",
+        F.when(col("active"), (F.rand(seed=1) * 5000).cast("long"))
+        .otherwise(0)
+        .alias("viewed"),
+        F.when(col("active"), (F.rand(seed=2) * 100).cast("long"))
+        .otherwise(0)
+        .alias("liked"),
+        F.when(col("active"), (F.rand(seed=3) * 300).cast("long"))
+        .otherwise(0)
+        .alias("num_of_comments"),
+    )
+
+
+def run(df, score_column, repeat):
+    """
+    점수 컬럼을 계산하고 합계를 구해 실행을 강제, 가장 빠른 시간을 반환
+    """
+    elapsed = []
+    total = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        total = df.select(F.sum(score_column)).first()[0]
+        elapsed.append(time.perf_counter() - start)
+
+    return min(elapsed), total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_keywords", type=int, default=1000)
+    parser.add_argument("--sparsity", type=float, default=0.9)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    spark = SparkSession.builder.appName("issue_score_benchmark").getOrCreate()
+
+    grid_df = make_grid_df(spark, args.num_keywords, args.sparsity).cache()
+    num_rows = grid_df.count()
+
+    issueization_udf = udf(get_issue_score, DoubleType())
+
+    udf_time, udf_total = run(
+        grid_df,
+        issueization_udf(col("viewed"), col("liked"), col("num_of_comments")),
+        args.repeat,
+    )
+    column_time, column_total = run(
+        grid_df,
+        get_issue_score_column(col("viewed"), col("liked"), col("num_of_comments")),
+        args.repeat,
+    )
+
+    print(f"rows: {num_rows} ({NUM_HOURS} hours x {args.num_keywords} keywords)")
+    print(f"python udf    : {udf_time:.3f}s")
+    print(f"column expr   : {column_time:.3f}s")
+    print(f"speedup       : {udf_time / column_time:.1f}x")
+    print(f"sum abs diff  : {abs(udf_total - column_total)}")
+
+    spark.stop()
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+    키워드 쏠림(skew) 집계 벤치마크
+
+    한 키워드(--hot_keyword)가 --hot_fraction 비율의 행에 나오는 키워드 단위 raw_data를 만들어
+    emr.py의 aggregate_issue_rollup ((시간, 키워드) 합계), make_frequency_df (키워드 합계)를
+    --salt_buckets (0이면 한 번에 groupBy), --aqe, --advisory_partition_sizes (AQE가 셔플 파티션을 합칠 목표 크기) 조합별로 실행합니다.
+    Spark UI REST API의 task 분포에서 stage마다 task 수행 시간과 셔플로 읽은 행 수의 중앙값/최댓값을 뽑아
+    가장 느린 task(straggler)가 중앙값보다 얼마나 오래 걸리는지 JSON 리포트로 출력합니다.
+
+    사용법:
+        spark-submit --master "local[*]" --py-files transform/issue_score.py,transform/post_schema.py \\
+            emr/benchmarks/skew_benchmark.py --num_rows 20000000 --salt_buckets 0,16 --aqe true,false
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.request
+
+from pyspark.sql import SparkSession
+import pyspark.sql.functions as F
+from pyspark.sql.functions import col, lit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "transform"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import emr
+from emr import SKEW, aggregate_issue_rollup, make_frequency_df
+
+
+WORKLOADS = {
+    "issue_rollup": aggregate_issue_rollup,
+    "frequency": lambda df: make_frequency_df(
+        df.select(
+            "keyword_id",
+            col("viewed").cast("double").alias("current_issueization"),
+        )
+    ),
+}
+
+# task 분포에서 뽑을 분위수 (중앙값, 최댓값)
+QUANTILES = "0.5,1.0"
+
+
+def make_raw_data_df(spark, args):
+    """
+    make_raw_data_df처럼 키워드 단위로 펼친 raw_data
+    hot_fraction 비율의 행은 hot_keyword, 나머지는 num_keywords개 키워드에 고르게 나눔
+    """
+    raw_data_df = spark.range(args.num_rows, numPartitions=args.partitions).select(
+        "id",
+        F.when(F.rand(seed=0) < args.hot_fraction, lit(0))
+        .otherwise((F.rand(seed=1) * args.num_keywords).cast("int") + 1)
+        .alias("keyword_id"),
+    )
+
+    # make_frequency_df는 make_keyword_dictionary_df의 정수 id로 집계
+    return raw_data_df.select(
+        F.when(col("keyword_id") == 0, lit(args.hot_keyword))
+        .otherwise(F.concat(lit("키워드"), col("keyword_id")))
+        .alias("keywords"),
+        "keyword_id",
+        (lit(1723298400) - (col("id") % args.hours) * 3600)
+        .cast("timestamp")
+        .cast("string")
+        .alias("file_create_time"),
+        (F.rand(seed=2) * 5000).cast("int").alias("viewed"),
+        (F.rand(seed=3) * 100).cast("int").alias("liked"),
+        (F.rand(seed=4) * 300).cast("int").alias("num_of_comments"),
+        (F.rand(seed=5) * 2 - 1).cast("float").alias("sentiment"),
+    )
+
+
+def get_rest(spark, path):
+    sc = spark.sparkContext
+    url = f"{sc.uiWebUrl}/api/v1/applications/{sc.applicationId}/{path}"
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def get_stage_skew(spark, group, poll_interval=0.5, timeout=30):
+    """
+    job group에서 실행된 stage마다 task 수, 수행 시간과 셔플 읽기 행 수의 중앙값/최댓값
+    """
+    deadline = time.time() + timeout
+    jobs = [job for job in get_rest(spark, "jobs") if job.get("jobGroup") == group]
+    while any(job["status"] == "RUNNING" for job in jobs) and time.time() < deadline:
+        time.sleep(poll_interval)
+        jobs = [job for job in get_rest(spark, "jobs") if job.get("jobGroup") == group]
+
+    stages = []
+    for stage_id in sorted({stage_id for job in jobs for stage_id in job["stageIds"]}):
+        for attempt in get_rest(spark, f"stages/{stage_id}"):
+            if attempt["status"] != "COMPLETE":
+                continue
+
+            summary = get_rest(
+                spark,
+                f"stages/{stage_id}/{attempt['attemptId']}/taskSummary?quantiles={QUANTILES}",
+            )
+            run_time = summary["executorRunTime"]
+            read_records = summary["shuffleReadMetrics"]["readRecords"]
+            stages.append(
+                {
+                    "stage_id": stage_id,
+                    "tasks": attempt["numCompleteTasks"],
+                    "task_run_time_ms_p50": run_time[0],
+                    "task_run_time_ms_max": run_time[1],
+                    "straggler_ratio": run_time[1] / max(run_time[0], 1),
+                    "shuffle_read_records_p50": read_records[0],
+                    "shuffle_read_records_max": read_records[1],
+                    "shuffle_read_records": attempt["shuffleReadRecords"],
+                    "shuffle_write_records": attempt["shuffleWriteRecords"],
+                }
+            )
+
+    return stages
+
+
+def run(spark, name, workload, raw_data_df, repeat):
+    """
+    결과를 noop으로 써서 실행을 강제, 가장 빠른 실행의 시간과 stage 분포를 반환
+    """
+    best = None
+    for i in range(repeat):
+        group = f"{name}:{i}"
+        spark.sparkContext.setJobGroup(group, group)
+
+        start = time.perf_counter()
+        workload(raw_data_df).write.format("noop").mode("overwrite").save()
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best[0]:
+            best = (elapsed, group)
+
+    return {"seconds": best[0], "stages": get_stage_skew(spark, best[1])}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_rows", type=int, default=20_000_000)
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--num_keywords", type=int, default=1000)
+    parser.add_argument("--hot_keyword", default="아이오닉6")
+    parser.add_argument("--hot_fraction", type=float, default=0.8)
+    parser.add_argument("--hours", type=int, default=emr.ANALYSIS_WINDOW_DAYS * 24)
+    parser.add_argument("--salt_buckets", default="0,16")
+    parser.add_argument("--aqe", default="true,false")
+    parser.add_argument("--advisory_partition_sizes", default="64m,8m", help="--aqe true일 때만 사용")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="JSON 리포트 경로, 없으면 표준 출력")
+    args = parser.parse_args()
+
+    spark = SparkSession.builder.appName("skew_benchmark").getOrCreate()
+    if not spark.sparkContext.uiWebUrl:
+        raise ValueError("spark.ui.enabled must be true to read task metrics")
+
+    # 입력 생성 시간이 섞이지 않도록 메모리에 올려둠
+    raw_data_df = make_raw_data_df(spark, args).cache()
+    raw_data_df.count()
+
+    report = {
+        "config": vars(args),
+        "spark": spark.version,
+        "default_parallelism": spark.sparkContext.defaultParallelism,
+        "shuffle_partitions": spark.conf.get("spark.sql.shuffle.partitions"),
+        "results": [],
+    }
+
+    configs = [
+        (aqe, size)
+        for aqe in args.aqe.split(",")
+        for size in (args.advisory_partition_sizes.split(",") if aqe == "true" else ["-"])
+    ]
+    for aqe, size in configs:
+        spark.conf.set("spark.sql.adaptive.enabled", aqe)
+        if size != "-":
+            spark.conf.set("spark.sql.adaptive.advisoryPartitionSizeInBytes", size)
+
+        for salt_buckets in [int(value) for value in args.salt_buckets.split(",")]:
+            SKEW["salt_buckets"] = salt_buckets
+            for name in args.workloads.split(","):
+                label = f"aqe={aqe}:advisory={size}:salt={salt_buckets}"
+                result = run(spark, f"{name}:{label}", WORKLOADS[name], raw_data_df, args.repeat)
+                report["results"].append(
+                    {
+                        "workload": name,
+                        "aqe": aqe,
+                        "advisory_partition_size": size,
+                        "salt_buckets": salt_buckets,
+                        **result,
+                    }
+                )
+
+                # 셔플을 읽는 stage 중 가장 느린 task
+                reduce_stages = [stage for stage in result["stages"] if stage["shuffle_read_records"]]
+                slowest = max(reduce_stages, key=lambda stage: stage["task_run_time_ms_max"])
+                print(
+                    f"{name:12} {label:32}: {result['seconds']:7.3f}s, "
+                    f"reduce tasks {slowest['tasks']:4}, "
+                    f"max {slowest['task_run_time_ms_max']:7.0f}ms, p50 {slowest['task_run_time_ms_p50']:7.0f}ms, "
+                    f"max read records {slowest['shuffle_read_records_max']:.0f}",
+                    file=sys.stderr,
+                )
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    spark.stop()
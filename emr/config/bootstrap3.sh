@@ -1,4 +1,4 @@
 #!/bin/bash -xe
 
-sudo python3 -m pip install psycopg2-binary boto3 scipy fastdtw matplotlib pandas numpy
+sudo python3 -m pip install psycopg2-binary boto3 scipy numba matplotlib pandas numpy pyarrow
 sudo yum update -y
\ No newline at end of file
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
-from pyspark.sql import SparkSession
+from pyspark import SparkContext, StorageLevel, TaskContext
+from pyspark.sql import DataFrame, SparkSession
 import sys
 import boto3
 import pyspark.sql.functions as F
@@ -8,33 +9,50 @@ from pyspark.sql.functions import (
     col,
     explode,
     sum,
-    udf,
     expr,
     broadcast,
     to_timestamp,
     collect_list,
     lit,
     from_json,
-    date_sub,
     sequence,
     substring,
 )
 from pyspark.sql.types import (
-    DoubleType,
     FloatType,
+    IntegerType,
     ArrayType,
     StringType,
+    StructType,
+    StructField,
 )
+import functools
+import inspect
+import io
 import json
-from math import log
-from scipy.spatial.distance import euclidean
-from scipy.stats import zscore
-from fastdtw import fastdtw
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import numpy as np
+import pandas as pd
+
+from post_schema import get_spark_schema
+from issue_score import (
+    get_issue_score_column,
+    to_sparse_points,
+    batch_dtw_similarity_score,
+    search_similar_issues,
+    make_signatures,
+    save_signatures,
+    load_signatures,
+    SIGNATURE_VERSION,
+)
 
 
 BUCKET_NAME = "monitordog-data"
 DIRECTORY_PATH = "keywords"
+PARQUET_DIRECTORY_PATH = "keywords_parquet"
 
 USERNAME = "<USERNAME>"
 PASSWORD = "<PASSWORD>"
@@ -43,96 +61,447 @@ REDSHIFT_IAM_ROLE = "<ARN>"
 
 S3_TEMP_DIR = "s3://ex-emr/temp/"
 
+REDSHIFT_REGION = "ap-northeast-2"
+REDSHIFT_CLUSTER_ID = "monitordog-redshift"
+REDSHIFT_DATABASE = "monitordog-dev"
+REDSHIFT_DB_USER = "monitordog-awsuser"
+
+# DataFrame 이름 -> 적재할 테이블
+REDSHIFT_TABLES = {
+    "raw_data_df": "raw_data",
+    "view_raw_data_df": "raw_data_view",
+    "issue_rollup_df": "issue_rollup",
+    "current_issue_df": "current_issue",
+    "frequency_df": "current_issue_frequency",
+    "similar_df": "similarity",
+    "issue_graph_df": "issue_graph",
+}
+
+# 적재 방식
+# - connector: spark-redshift 커넥터로 테이블마다 순서대로 UNLOAD/COPY
+# - staged: 모든 테이블을 S3에 동시에 스테이징한 뒤 하나의 트랜잭션에서 COPY
+# - swap: staged와 같지만 대시보드 테이블은 스테이징 테이블에 COPY 한 뒤 이름을 바꿔 교체
+DEFAULT_LOAD_MODE = "connector"
+DEFAULT_LOAD_WORKERS = 4
+S3_STAGING_DIR = "s3://ex-emr/temp/staging"
+# raw_data 적재 방식
+# - append: 매 실행의 게시글을 그대로 추가 (다시 수집된 게시글도 중복으로 쌓임)
+# - merge: 스테이징 테이블에 적재한 뒤 url 기준으로 MERGE, 최신 file_create_time의 값만 유지
+#   raw_data_view는 게시글을 키워드마다 한 행으로 저장하므로 같은 url의 행을 모두 바꿈
+DEFAULT_RAW_DATA_MODE = "append"
+RAW_DATA_STAGING_TABLE = "raw_data_staging"
+RAW_DATA_VIEW_STAGING_TABLE = "raw_data_view_staging"
+# DataFrame 이름 -> merge 모드에서 적재할 스테이징 테이블
+RAW_DATA_STAGING_TABLES = {
+    "raw_data_df": RAW_DATA_STAGING_TABLE,
+    "view_raw_data_df": RAW_DATA_VIEW_STAGING_TABLE,
+}
+
+# raw_data 보관 기간
+# --retention_days가 0보다 크면 하루에 한 번(RAW_DATA_MAINTENANCE_HOUR) 보관 기간이 지난 행을
+# 날짜별 Parquet으로 S3에 UNLOAD 한 뒤 삭제하고 VACUUM으로 정렬/공간을 정리, raw_data_view는 삭제만 함
+# 분석 기간 경계의 게시글이 다시 수집되거나 늦게 처리될 수 있으므로 분석 기간 + 여유 일수 이상만 허용
+DEFAULT_RETENTION_DAYS = 0
+RAW_DATA_RETENTION_MARGIN_DAYS = 7
+RAW_DATA_MAINTENANCE_HOUR = 4
+RAW_DATA_ARCHIVE_DIR = f"s3://{BUCKET_NAME}/raw_data_archive"
+
+# 대시보드 뷰가 읽는 테이블
+DASHBOARD_DATA = ["current_issue_df", "frequency_df", "similar_df", "issue_graph_df"]
+# spark-redshift 커넥터와 같은 null 표기
+STAGING_NULL_VALUE = "@NULL@"
+
+# 한 번에 처리할 keywords/{recent_time} 파일 수 (커뮤니티 x 차종)
+DEFAULT_NUM_FILES = 4
+
+# keywords/ 단계 게시글 스키마 (transform/post_schema.py에서 관리)
+KEYWORD_POST_SCHEMA = get_spark_schema("keywords")
+
+# keywords_parquet/ 파티션 컬럼 (crawl_hour=.../data_source=.../model=...)
+KEYWORD_PARQUET_PARTITION_FIELDS = [
+    StructField("crawl_hour", StringType()),
+    StructField("data_source", StringType()),
+    StructField("model", StringType()),
+]
+KEYWORD_PARQUET_SCHEMA = StructType(
+    get_spark_schema("keywords", exclude=("data_source", "model")).fields
+    + KEYWORD_PARQUET_PARTITION_FIELDS
+)
 
+# 이슈화 분석 기간 (일), issue_rollup도 이 기간만큼 보관
+ANALYSIS_WINDOW_DAYS = 62
+# --window_hours가 0이면 ANALYSIS_WINDOW_DAYS일 전 자정부터, 0보다 크면 마지막 N시간만 분석
+# 짧은 기간은 raw_data, issue_rollup에서 해당 기간만 읽으며 issue_rollup은 덮어쓰지 않고 새 시간대만 추가
+DEFAULT_WINDOW_HOURS = 0
+# 이슈화 시간 그리드 간격 (분), 60의 약수
+# 과거 이슈가 1시간 단위이므로 유사도는 간격과 상관없이 1시간 단위로 합쳐서 비교
+DEFAULT_BUCKET_MINUTES = 60
+
+# 이슈화 집계 컬럼 (시간, 키워드 단위 합계)
+ISSUE_AGG_COLUMNS = ["num_of_comments", "viewed", "liked", "sentiment"]
+
+# 이슈화 계산에 필요한 raw_data 컬럼 (본문, 댓글 등 텍스트는 UNLOAD 하지 않음)
+ISSUE_RAW_DATA_COLUMNS = ["keywords", "file_create_time", *ISSUE_AGG_COLUMNS]
+
+# DTW 유사도 계산 설정
+DTW_SCALE_FACTOR = 50
+DTW_RADIUS = 1
+# 키워드마다 저장할 유사한 과거 이슈 수, 0이면 모든 (키워드, 과거 이슈) 쌍을 저장
+# 0보다 크면 하한(LB_Kim, LB_Keogh)으로 k개 안에 들 수 없는 과거 이슈의 DTW 계산을 건너뜀
+DEFAULT_SIMILARITY_TOP_K = 0
+# top-k 검색에서 비교할 최근 기간(시간 수), 비어있으면 분석 기간 전체만 비교
+DEFAULT_SIMILARITY_WINDOWS = ""
+
+# 과거 이슈 DTW 전처리 결과(시그니처) 캐시, past_issue가 바뀌었을 때만 다시 만듦
+SIGNATURE_BUCKET = "ex-emr"
+SIGNATURE_KEY = "cache/past_issue_signatures.npz"
+# past_issue가 바뀌었는지 확인하기 위한 요약 값 (UNLOAD 없이 Data API로 조회)
+PAST_ISSUE_FINGERPRINT_QUERY = """
+    SELECT COUNT(*), COUNT(DISTINCT past_issue_name), MIN(created_at), MAX(created_at),
+        SUM(past_issueization),
+        SUM(MOD(FNV_HASH(past_issue_name || created_at::varchar || past_issueization::varchar), 1000000007))
+    FROM past_issue
 """
-    -- udf로 등록해서 쓴 함수 --
-
-    dtw_similarity_score(x, y, radius: int = 1) -> float:
-    get_issue_score(viewed: float, liked: float, num_of_comments: float) -> float:
-"""
-
-
-# DTW 유사도 함수 정의
-def dtw_similarity_score(a, b, scale_factor: float = 50, radius: int = 1) -> float:
-    """
-    정규화된 DTW 유사도 계산
-    :param x: 그래프를 나타내는 1차원 리스트 (pd.Series)
-    :param y: 그래프를 나타내는 1차원 리스트 (pd.Series), x와 길이가 동일해야 정확한 값이 나옴
-    :param radius: Fast DTW 알고리즘에서 경로를 탐색할 범위
-    :return: [0,1] 사이의 실수값, 1에 가까울수록 유사한 그래프
-    """
-    a = a.to_numpy()
-    b = b.to_numpy()
 
-    a_x = np.arange(len(a))[a != 0]
-    b_x = np.arange(len(b))[b != 0]
+# I/O 백엔드 (main에서 --io_backend, --local_root로 덮어씀)
+# - aws: S3, Redshift(spark-redshift 커넥터, redshift-data), SNS
+# - local: local_io.py (S3 -> {root}/{bucket}/ 파일, Redshift -> {root}/redshift/ Parquet 테이블, SNS -> 메모리, JSONL)
+IO_BACKEND = {
+    "backend": "aws",
+    "root": None,
+}
+
+# 중간 결과 재사용 설정 (main에서 job 매개변수로 덮어씀)
+# - stages: persist 할 단계 (extract, current_issue, frequency, similarity)
+# - storage_level: pyspark StorageLevel 이름
+# - track: 단계별 계산 횟수 기록 여부
+MATERIALIZATION = {
+    "stages": {"extract", "current_issue", "frequency", "similarity"},
+    "storage_level": "MEMORY_AND_DISK",
+    "track": False,
+}
+
+# 키워드 쏠림 처리 (main에서 --skew_salt_buckets로 덮어씀)
+# - salt_buckets: 0보다 크면 키워드 단위 합계를 (키, salt)로 먼저 합친 뒤 salt를 빼고 다시 합치는 2단계 집계
+#   한 키워드가 대부분의 게시글에 나와도 첫 셔플에서 그 키워드의 행이 salt_buckets개 파티션으로 나뉨
+SKEW = {
+    "salt_buckets": 0,
+}
+
+# AQE 관련 job 매개변수 -> Spark SQL 설정, 주어진 매개변수만 job 시작 시 spark.conf에 적용
+# 주지 않으면 클러스터 기본값 (EMR, Spark 3.2 이상은 AQE와 skew join 분할이 켜져 있음)
+AQE_CONF_ARGS = {
+    "--aqe": "spark.sql.adaptive.enabled",
+    "--aqe_coalesce_partitions": "spark.sql.adaptive.coalescePartitions.enabled",
+    "--aqe_advisory_partition_size": "spark.sql.adaptive.advisoryPartitionSizeInBytes",
+    "--aqe_skew_join": "spark.sql.adaptive.skewJoin.enabled",
+    "--aqe_skew_factor": "spark.sql.adaptive.skewJoin.skewedPartitionFactor",
+    "--aqe_skew_threshold": "spark.sql.adaptive.skewJoin.skewedPartitionThresholdInBytes",
+    "--shuffle_partitions": "spark.sql.shuffle.partitions",
+}
+
+# 단계별 측정 설정 (main에서 --metrics, --metrics_row_counts로 덮어씀)
+# - enabled: instrument를 붙인 함수의 수행 시간과 Spark job/stage 지표를 기록하고 실행 리포트 저장
+# - row_counts: 단계 입출력 DataFrame의 행 수를 count()로 셈 (action이 추가되므로 측정할 때만 사용)
+METRICS = {
+    "enabled": False,
+    "row_counts": False,
+}
+
+# 실행 리포트 저장 경로 (s3://monitordog-data/run_reports/{recent_time}/)
+# keywords/ 아래에 두면 emr_callback.py가 최신 파일로 읽으므로 따로 둠
+RUN_REPORT_DIRECTORY_PATH = "run_reports"
+
+# Spark UI REST API stage 필드 -> 리포트 이름
+SPARK_STAGE_METRICS = {
+    "tasks": "numCompleteTasks",
+    "failed_tasks": "numFailedTasks",
+    "executor_run_time_ms": "executorRunTime",
+    "executor_cpu_time_ns": "executorCpuTime",
+    "jvm_gc_time_ms": "jvmGcTime",
+    "input_bytes": "inputBytes",
+    "input_records": "inputRecords",
+    "output_bytes": "outputBytes",
+    "output_records": "outputRecords",
+    "shuffle_read_bytes": "shuffleReadBytes",
+    "shuffle_read_records": "shuffleReadRecords",
+    "shuffle_write_bytes": "shuffleWriteBytes",
+    "shuffle_write_records": "shuffleWriteRecords",
+    "memory_bytes_spilled": "memoryBytesSpilled",
+    "disk_bytes_spilled": "diskBytesSpilled",
+}
+
+# 단계별 기록, 행 수를 센 DataFrame
+STAGE_RECORDS = []
+ROW_COUNTS = {}
+
+# persist 한 DataFrame, 단계별 계산 횟수 accumulator
+PERSISTED_DFS = {}
+STAGE_COMPUTATIONS = {}
+
+# 이번 실행의 키워드 -> 정수 id (make_keyword_dictionary_df)
+KEYWORD_DICTIONARY_SCHEMA = StructType(
+    [
+        StructField("keyword_id", IntegerType(), False),
+        StructField("current_keyword", StringType(), False),
+    ]
+)
 
-    a_nonzero = a[a != 0]
-    b_nonzero = b[b != 0]
+SIMILARITY_SCHEMA = StructType(
+    [
+        StructField("current_keyword", StringType()),
+        StructField("past_issue_name", StringType()),
+        StructField("similarity_degree", FloatType()),
+    ]
+)
 
-    num_a_nonzero = len(a_nonzero)
-    num_b_nonzero = len(b_nonzero)
+# --similarity_top_k > 0 이면 비교 기간(시간 수)과 기간 안에서의 순위를 함께 저장
+SIMILARITY_TOP_K_SCHEMA = StructType(
+    SIMILARITY_SCHEMA.fields
+    + [
+        StructField("window_hours", IntegerType()),
+        StructField("similarity_rank", IntegerType()),
+    ]
+)
 
-    # 비영 영역이 없는 경우 처리
-    if num_a_nonzero == 0 and num_b_nonzero == 0:
-        return 0.0  # 아무런 신호가 없는 경우 무시하기 위해 0 반환
-    elif num_a_nonzero == 0 or num_b_nonzero == 0:
-        return 0.0
 
-    a_nonzero = zscore(a_nonzero)
-    b_nonzero = zscore(b_nonzero)
+"""
+    -- transform/issue_score.py, transform/post_schema.py에서 가져와 쓰는 함수 (--py-files로 전달) --
+
+    get_spark_schema(stage: str = "keywords") -> StructType:
+    get_issue_score_column(viewed, liked, num_of_comments) -> Column:
+    to_sparse_points(series) -> np.ndarray:
+    batch_dtw_similarity_score(a, bs, scale_factor: float = 50, radius: int = 1) -> np.ndarray:
+    search_similar_issues(series, signatures, k: int = 5, windows: list = None, scale_factor: float = 50, radius: int = 1, min_similarity: float = 0.0, window_signatures: dict = None) -> list:
+    make_signatures(names, series_list) -> dict:
+    save_signatures(signatures, file, fingerprint: str = "") -> None:
+    load_signatures(file) -> dict:
+"""
 
-    a_nonzero = np.vstack((a_x, a_nonzero)).T
-    b_nonzero = np.vstack((b_x, b_nonzero)).T
 
-    raw_distance, _ = fastdtw(a_nonzero, b_nonzero, radius=radius, dist=euclidean)
+"""
+    -- 단계별 측정과 관련된 함수 (--metrics true) --
+
+    instrument(key=None)
+        - 함수 호출 하나를 단계로 기록하는 데코레이터, key가 주어지면 해당 인자 값을 단계 이름에 붙임
+        - 단계 안에서 실행된 Spark job은 단계 이름의 job group으로 묶음
+    count_rows(df)
+        - DataFrame 행 수 (같은 DataFrame은 한 번만 셈)
+    collect_spark_metrics(spark)
+        - Spark UI REST API로 job group별 stage 지표(수행 시간, 입출력, 셔플 바이트) 합계
+    make_run_report(spark, recent_time, timestamp, status, elapsed)
+        - 실행 설정, 단계별 기록, Spark 지표를 합친 리포트
+    save_run_report(report, recent_time)
+        - 리포트를 S3 run_reports/{recent_time}/에 JSON으로 저장
+"""
 
-    # 정규화된 거리 계산 (0과 1 사이의 값)
-    similarity_score = np.exp(-raw_distance / scale_factor)
 
-    return similarity_score
+def instrument(key=None):
+    def decorator(function):
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not METRICS["enabled"]:
+                return function(*args, **kwargs)
+
+            arguments = signature.bind(*args, **kwargs).arguments
+            stage = function.__name__
+            if key is not None:
+                stage = f"{stage}:{arguments[key]}"
+
+            # getActiveSession은 스레드마다 따로라 stage_all의 작업 스레드에서는 None이므로 SparkContext를 직접 가져옴
+            sc = SparkContext.getOrCreate()
+            # 단계 안에서 다른 단계를 호출하면 끝난 뒤 바깥 단계의 job group으로 되돌림
+            previous_group = sc.getLocalProperty("spark.jobGroup.id")
+            sc.setJobGroup(stage, stage)
+
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                sc.setLocalProperty("spark.jobGroup.id", previous_group)
+                sc.setLocalProperty("spark.job.description", previous_group)
+
+            record = {"stage": stage, "seconds": elapsed}
+            if METRICS["row_counts"]:
+                # 행 수를 세는 job은 단계 지표에 섞이지 않도록 따로 묶음
+                sc.setJobGroup(f"row_counts:{stage}", f"row_counts:{stage}")
+                outputs = result if isinstance(result, tuple) else (result,)
+                record["input_rows"] = [
+                    count_rows(value)
+                    for value in arguments.values()
+                    if isinstance(value, DataFrame)
+                ]
+                record["output_rows"] = [
+                    count_rows(value) for value in outputs if isinstance(value, DataFrame)
+                ]
+                sc.setLocalProperty("spark.jobGroup.id", previous_group)
+                sc.setLocalProperty("spark.job.description", previous_group)
+
+            STAGE_RECORDS.append(record)
+            print(f"stage {stage}: {elapsed:.3f}s")
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def count_rows(df):
+    # id는 DataFrame이 사라지면 재사용되므로 DataFrame도 함께 보관
+    if id(df) not in ROW_COUNTS:
+        ROW_COUNTS[id(df)] = (df, df.count())
+
+    return ROW_COUNTS[id(df)][1]
+
+
+def collect_spark_metrics(spark, poll_interval=1, timeout=30):
+    sc = spark.sparkContext
+    if not sc.uiWebUrl:
+        print("spark ui is disabled, skip spark metrics")
+        return {}
+
+    base_url = f"{sc.uiWebUrl}/api/v1/applications/{sc.applicationId}"
+
+    def get(path):
+        with urllib.request.urlopen(f"{base_url}/{path}") as response:
+            return json.loads(response.read())
+
+    # 리스너가 마지막 job 종료 이벤트를 처리할 때까지 대기
+    deadline = time.time() + timeout
+    jobs = get("jobs")
+    while any(job["status"] == "RUNNING" for job in jobs) and time.time() < deadline:
+        time.sleep(poll_interval)
+        jobs = get("jobs")
+
+    # 재사용된 셔플 stage는 여러 job에 속하므로 처음 실행한 job의 group으로만 셈
+    stage_groups = {}
+    for job in sorted(jobs, key=lambda job: job["jobId"]):
+        for stage_id in job["stageIds"]:
+            stage_groups.setdefault(stage_id, job.get("jobGroup", "none"))
+
+    group_metrics = {}
+    for stage in get("stages"):
+        if stage["status"] not in ("COMPLETE", "FAILED"):
+            continue
+
+        metrics = group_metrics.setdefault(
+            stage_groups.get(stage["stageId"], "none"),
+            {name: 0 for name in ["jobs", "stages", *SPARK_STAGE_METRICS]},
+        )
+        metrics["stages"] += 1
+        for name, field in SPARK_STAGE_METRICS.items():
+            metrics[name] += stage.get(field, 0)
+
+    for job in jobs:
+        group = job.get("jobGroup", "none")
+        if group in group_metrics:
+            group_metrics[group]["jobs"] += 1
+
+    return group_metrics
+
+
+def make_run_report(spark, recent_time, timestamp, status, elapsed):
+    # Spark UI REST API는 YARN cluster 모드에서 AM 프록시 뒤에 있어 실패할 수 있으므로 spark 지표 없이 리포트 생성
+    spark_metrics_error = None
+    try:
+        spark_metrics = collect_spark_metrics(spark)
+    except Exception as e:
+        print(f"failed to collect spark metrics: {e!r}")
+        spark_metrics, spark_metrics_error = {}, repr(e)
+
+    stages = []
+    for record in STAGE_RECORDS:
+        stages.append({**record, "spark": spark_metrics.pop(record["stage"], {})})
+
+    return {
+        "recent_time": recent_time,
+        "timestamp": timestamp,
+        "status": status,
+        "seconds": elapsed,
+        "application_id": spark.sparkContext.applicationId,
+        "args": sys.argv[1:],
+        "stages": stages,
+        # 단계 밖에서 실행된 job, 행 수를 세는 job
+        "other_spark_metrics": spark_metrics,
+        "stage_computations": get_stage_computations(),
+        "spark_metrics_error": spark_metrics_error,
+    }
 
 
-def get_issue_score(viewed: float, liked: float, num_of_comments: float) -> float:
-    """
-    특정 시간대의 게시글들의 이슈화 정도를 점수화
-    :param viewed: 특정 시간대 내 게시글들의 조회수 총합
-    :param liked: 특정 시간대 내 추천 수 총합
-    :param num_of_comments: 특정 시간대 내 댓글 수 총합
-    :return: 특정 시간대에서의 이슈화 점수
-    """
-    return viewed + log(1 + liked) + log(1 + num_of_comments)
+def save_run_report(report, recent_time):
+    run_id = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
+    key = f"{RUN_REPORT_DIRECTORY_PATH}/{recent_time}/{run_id}.json"
 
+    write_s3_object(
+        BUCKET_NAME, key, json.dumps(report, indent=2, ensure_ascii=False).encode("utf-8")
+    )
+    print(f"run report: {get_s3_path(BUCKET_NAME, key)}")
 
-# UDF 등록
-issueization_udf = udf(get_issue_score, DoubleType())
-dtw_similarity_score_udf = udf(dtw_similarity_score, FloatType())
+    return key
 
 
 """
     -- redshift에서 읽거나 쓰기는 함수 --
 
-    read_from_redshift(spark, data)
-        - 필요한 과거 이슈 데이터, 비교할 두달치 데이터 읽기
-    load_to_redshift(df, data)
+    read_from_redshift(spark, data, columns=None, predicate=None)
+        - 필요한 과거 이슈 데이터, 비교할 두달치 데이터, (시간, 키워드) 집계 읽기
+        - columns, predicate가 주어지면 해당 컬럼과 조건만 UNLOAD
+    load_to_redshift(df, data, mode=None, preactions=None)
         - 그래프로 보여줄 데이터 쓰기
+    make_issue_rollup_preactions(timestamp)
+        - 증분 모드에서 (시간, 키워드) 집계를 덮어쓰기 전 실행할 SQL
+    get_retention_cutoff(timestamp, retention_days)
+        - raw_data, raw_data_view에 남겨둘 가장 오래된 날짜
+    make_raw_data_archive_sqls(timestamp, retention_days)
+        - 보관 기간이 지난 raw_data를 날짜별 Parquet으로 UNLOAD 후 삭제하는 SQL
+    maintain_raw_data(timestamp, retention_days)
+        - 보관 기간이 지난 raw_data, raw_data_view 정리 후 VACUUM, ANALYZE
+    make_raw_data_merge_sqls(columns, staging_table)
+        - 스테이징 테이블의 게시글을 url 기준으로 raw_data에 병합하는 SQL
+    make_raw_data_view_merge_sqls(columns, staging_table)
+        - 스테이징 테이블의 게시글로 raw_data_view의 같은 url 행을 모두 바꾸는 SQL
+    make_staging_merge_sqls(data, columns)
+        - merge 모드에서 raw_data, raw_data_view 스테이징 테이블을 병합하는 SQL
     delete_issue_graph_view_and_keyword_frequency_view()
-        - 그래프로 나타낼 뷰 삭제
+        - 그래프로 나타낼 뷰 삭제 (완료될 때까지 대기)
     create_issue_graph_view_and_keyword_frequency_view()
-        - 그래프로 나타낼 뷰 생성
+        - 그래프로 나타낼 뷰 생성 (완료될 때까지 대기)
 """
 
 
-def read_from_redshift(spark, data):
+def make_redshift_query(table, columns=None, predicate=None):
+    # 필요한 컬럼과 기간만 UNLOAD 하도록 SELECT 문 생성
+    query = f"SELECT {', '.join(columns) if columns else '*'} FROM {table}"
+    if predicate:
+        query += f" WHERE {predicate}"
+
+    return query
+
+
+def read_from_redshift(spark, data, columns=None, predicate=None):
+    if is_local():
+        return get_local_io().read_table(
+            spark, IO_BACKEND["root"], REDSHIFT_TABLES.get(data, data), columns, predicate
+        )
+
     if data == "raw_data_df":
-        raw_data_df = (
+        reader = (
             spark.read.format("io.github.spark_redshift_community.spark.redshift")
             .option("url", REDSHIFT_JDBC_URL)
-            .option("dbtable", "raw_data")
             .option("tempdir", S3_TEMP_DIR)
             .option("aws_iam_role", REDSHIFT_IAM_ROLE)
-            .load()
         )
+        if columns or predicate:
+            reader = reader.option(
+                "query", make_redshift_query("raw_data", columns, predicate)
+            )
+        else:
+            reader = reader.option("dbtable", "raw_data")
+        raw_data_df = reader.load()
         return raw_data_df
     elif data == "past_issue":
         past_issue_df = (
@@ -144,17 +513,73 @@ def read_from_redshift(spark, data):
             .load()
         )
         return past_issue_df
-
-
-def load_to_redshift(df, data):
-    if data == "raw_data_df":
+    elif data == "issue_rollup":
+        issue_rollup_df = (
+            spark.read.format("io.github.spark_redshift_community.spark.redshift")
+            .option("url", REDSHIFT_JDBC_URL)
+            .option("dbtable", "issue_rollup")
+            .option("tempdir", S3_TEMP_DIR)
+            .option("aws_iam_role", REDSHIFT_IAM_ROLE)
+            .load()
+        )
+        return issue_rollup_df
+
+
+@instrument(key="data")
+def load_to_redshift(df, data, mode=None, preactions=None):
+    if is_local():
+        # 커넥터와 같은 기본 모드 (raw_data는 추가, 나머지는 덮어쓰기)
+        print(f"save {data} (local)")
+        local_io = get_local_io()
+        if data in RAW_DATA_STAGING_TABLES and mode == "merge":
+            local_io.merge_table(df, IO_BACKEND["root"], REDSHIFT_TABLES[data])
+        else:
+            default_mode = "append" if data == "raw_data_df" else "overwrite"
+            local_io.write_table(
+                df, IO_BACKEND["root"], REDSHIFT_TABLES[data], mode or default_mode, preactions
+            )
+        return
+
+    if data in RAW_DATA_STAGING_TABLES and mode == "merge":
+        print(f"save {data} (merge)")
+        # 커넥터가 만든 테이블 대신 대상 테이블과 같은 컬럼 타입의 스테이징 테이블에 COPY 하고
+        # 같은 트랜잭션에서 병합 후 스테이징 테이블 삭제
+        table = REDSHIFT_TABLES[data]
+        staging_table = RAW_DATA_STAGING_TABLES[data]
+        preactions = (
+            f"DROP TABLE IF EXISTS {staging_table};"
+            f"CREATE TABLE {staging_table} (LIKE {table})"
+        )
+        postactions = ";".join(
+            make_staging_merge_sqls(data, df.columns)
+            + [f"DROP TABLE {staging_table}"]
+        )
+        df.write.format("io.github.spark_redshift_community.spark.redshift").option(
+            "url", REDSHIFT_JDBC_URL
+        ).option("dbtable", staging_table).option(
+            "tempdir", S3_TEMP_DIR
+        ).option(
+            "tempformat", "CSV GZIP"
+        ).option(
+            "aws_iam_role", REDSHIFT_IAM_ROLE
+        ).option(
+            "preactions", preactions
+        ).option(
+            "postactions", postactions
+        ).mode(
+            "append"
+        ).save()
+    elif data == "raw_data_df":
         print("save raw_data_df")
+        # 테이블이 없어 새로 만들 때는 기간 조건으로 읽는 블록만 스캔하도록 file_create_time으로 정렬
         df.write.format("io.github.spark_redshift_community.spark.redshift").option(
             "url", REDSHIFT_JDBC_URL
         ).option("dbtable", "raw_data").option("tempdir", S3_TEMP_DIR).option(
             "tempformat", "CSV GZIP"
         ).option(
             "aws_iam_role", REDSHIFT_IAM_ROLE
+        ).option(
+            "sortkeyspec", "COMPOUND SORTKEY(file_create_time)"
         ).mode(
             "append"
         ).save()
@@ -167,7 +592,7 @@ def load_to_redshift(df, data):
         ).option(
             "aws_iam_role", REDSHIFT_IAM_ROLE
         ).mode(
-            "overwrite"
+            mode or "overwrite"
         ).save()
     elif data == "current_issue_df":
         print("save current_issue_df")
@@ -193,6 +618,37 @@ def load_to_redshift(df, data):
         ).mode(
             "overwrite"
         ).save()
+    elif data == "issue_rollup_df":
+        print(f"save issue_rollup_df ({mode})")
+        writer = (
+            df.write.format("io.github.spark_redshift_community.spark.redshift")
+            .option("url", REDSHIFT_JDBC_URL)
+            .option("dbtable", "issue_rollup")
+            .option("tempdir", S3_TEMP_DIR)
+            .option("tempformat", "CSV GZIP")
+            .option("aws_iam_role", REDSHIFT_IAM_ROLE)
+        )
+        if preactions:
+            writer = writer.option("preactions", preactions)
+        writer.mode(mode or "overwrite").save()
+    elif data == "issue_graph_df":
+        print("save issue_graph_df")
+        # 대시보드는 키워드 하나의 시간 범위를 읽으므로 (키워드, 시간) 순으로 정렬해 저장
+        df.write.format("io.github.spark_redshift_community.spark.redshift").option(
+            "url", REDSHIFT_JDBC_URL
+        ).option("dbtable", "issue_graph").option("tempdir", S3_TEMP_DIR).option(
+            "tempformat", "CSV GZIP"
+        ).option(
+            "aws_iam_role", REDSHIFT_IAM_ROLE
+        ).option(
+            "diststyle", "KEY"
+        ).option(
+            "distkey", "current_keyword"
+        ).option(
+            "sortkeyspec", "COMPOUND SORTKEY(current_keyword, created_at)"
+        ).mode(
+            "overwrite"
+        ).save()
     if data == "similar_df":
         print("save similar_df")
         df.write.format("io.github.spark_redshift_community.spark.redshift").option(
@@ -206,102 +662,441 @@ def load_to_redshift(df, data):
         ).save()
 
 
-def delete_issue_graph_view_and_keyword_frequency_view():
+def get_analysis_window(timestamp, window_hours=DEFAULT_WINDOW_HOURS):
+    """
+    Spark 필터, 시간 그리드와 Redshift SQL에서 함께 쓰는 분석 기간
+    window_hours가 0이면 ANALYSIS_WINDOW_DAYS일 전 자정부터, 0보다 크면 마지막 window_hours시간
+    """
+    end_date = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+    if window_hours > 0:
+        start_date = end_date - timedelta(hours=window_hours)
+    else:
+        start_date = datetime.combine(
+            (end_date - timedelta(days=ANALYSIS_WINDOW_DAYS)).date(), datetime.min.time()
+        )
 
-    client = boto3.client("redshift-data", region_name="ap-northeast-2")
+    return start_date, end_date
 
-    cluster_id = "monitordog-redshift"
-    database = "monitordog-dev"
-    db_user = "monitordog-awsuser"
 
-    issue_graph_view_sql_query = f"DROP VIEW IF EXISTS issue_graph_view;"
+def to_bucket_time(time_column, start_date, bucket_minutes=DEFAULT_BUCKET_MINUTES):
+    # start_date부터 bucket_minutes 간격의 시간 그리드로 내림 (dense 모드 시간 그리드와 같은 시각)
+    start = start_date.cast("long")
+    bucket_seconds = bucket_minutes * 60
 
-    response = client.execute_statement(
-        ClusterIdentifier=cluster_id,
-        Database=database,
-        DbUser=db_user,
-        Sql=issue_graph_view_sql_query,
-    )
+    return (
+        start
+        + F.floor((time_column.cast("long") - start) / bucket_seconds) * bucket_seconds
+    ).cast("timestamp")
 
-    keyword_frequency_view_sql_query = f"DROP VIEW IF EXISTS keyword_frequency_view;"
 
-    response = client.execute_statement(
-        ClusterIdentifier=cluster_id,
-        Database=database,
-        DbUser=db_user,
-        Sql=keyword_frequency_view_sql_query,
+def make_issue_rollup_preactions(timestamp):
+    """
+    같은 시간대를 다시 처리해도 중복 집계되지 않도록 해당 시간의 행과 분석 기간이 지난 행을 삭제
+    짧은 기간(--window_hours) 실행도 ANALYSIS_WINDOW_DAYS 기준으로 정리해 긴 기간 실행에 필요한 집계를 남김
+    """
+    start_date, end_date = get_analysis_window(timestamp)
+
+    return (
+        f"DELETE FROM issue_rollup WHERE file_create_time = '{end_date}';"
+        f"DELETE FROM issue_rollup WHERE file_create_time < '{start_date}';"
     )
 
 
-def create_issue_graph_view_and_keyword_frequency_view():
+def get_retention_cutoff(timestamp, retention_days):
+    """
+    raw_data에서 남겨둘 가장 오래된 날짜, 분석 기간 + 여유 일수보다 짧으면 전체 모드 집계가 틀어질 수 있으므로 에러
+    """
+    min_retention_days = ANALYSIS_WINDOW_DAYS + RAW_DATA_RETENTION_MARGIN_DAYS
+    if retention_days < min_retention_days:
+        raise ValueError(
+            f"retention_days ({retention_days}) must be >= ANALYSIS_WINDOW_DAYS + "
+            f"RAW_DATA_RETENTION_MARGIN_DAYS ({min_retention_days})"
+        )
 
-    client = boto3.client("redshift-data", region_name="ap-northeast-2")
+    end_date = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
 
-    cluster_id = "monitordog-redshift"
-    database = "monitordog-dev"
-    db_user = "monitordog-awsuser"
+    return (end_date - timedelta(days=retention_days)).date()
 
-    issue_graph_view_sql_query = f"""
-        create view issue_graph_view as
-        select *
-        from (
-            SELECT 
-                DATEADD(SECOND,
-                    (SELECT 
-                        DATEDIFF(SECOND, created_at, DATE_TRUNC('hour', DATEADD(month, -2, GETDATE()))) AS diff
-                    FROM past_issue
-                    WHERE past_issue_name = 'g80 급발진'
-                    ORDER BY created_at
-                    LIMIT 1),
-                created_at) AS created_at, 
-                past_issue_name,
-                past_issueization,
-                past_sentiment
-            FROM past_issue
-            ORDER BY created_at
-        ) as t1
-        join (
-            SELECT 
-                DATEADD(SECOND,
-                    (SELECT 
-                        DATEDIFF(SECOND, created_at, DATE_TRUNC('hour', DATEADD(month, -2, GETDATE()))) AS diff
-                    FROM current_issue
-                    ORDER BY created_at
-                    LIMIT 1),
-                created_at) AS created_at, 
-                current_keyword,
-                current_issueization,
-                num_of_comments,
-                viewed,
-                liked,
-                sentiment
-            FROM current_issue
-            ORDER BY created_at
-        ) as t2
-        using (created_at)
+
+def make_raw_data_archive_sqls(timestamp, retention_days):
+    """
+    보관 기간이 지난 raw_data 행을 file_date 파티션의 Parquet으로 UNLOAD 한 뒤 삭제하는 SQL
+    raw_data_view는 raw_data의 앞부분만 잘라 저장한 것이므로 UNLOAD 없이 삭제
+    실행마다 archived_at 경로를 따로 쓰므로 같은 시간대를 다시 실행하면 UNLOAD가 실패하고 삭제도 되지 않음
     """
+    cutoff = get_retention_cutoff(timestamp, retention_days)
+    archived_at = timestamp.replace(" ", "T").replace(":", "-")
+
+    return [
+        f"""
+        UNLOAD ('SELECT *, TRUNC(file_create_time) AS file_date FROM raw_data WHERE file_create_time < \\'{cutoff}\\'')
+        TO '{RAW_DATA_ARCHIVE_DIR}/archived_at={archived_at}/'
+        IAM_ROLE '{REDSHIFT_IAM_ROLE}'
+        FORMAT AS PARQUET
+        PARTITION BY (file_date)
+        """,
+        f"DELETE FROM raw_data WHERE file_create_time < '{cutoff}'",
+        f"DELETE FROM raw_data_view WHERE file_create_time < '{cutoff}'",
+    ]
+
+
+@instrument()
+def maintain_raw_data(timestamp, retention_days):
+    """
+    보관 기간이 지난 raw_data를 S3로 옮기고 raw_data_view에서도 삭제한 뒤, 지워진 공간 회수와 정렬을 위해 VACUUM
+    VACUUM은 트랜잭션 안에서 실행할 수 없으므로 따로 실행
+    """
+    cutoff = get_retention_cutoff(timestamp, retention_days)
+    print(f"archive raw_data older than {cutoff}")
+
+    if is_local():
+        # UNLOAD, VACUUM 대신 RAW_DATA_ARCHIVE_DIR와 같은 구조로 Parquet을 복사한 뒤 삭제만 함
+        archived_at = timestamp.replace(" ", "T").replace(":", "-")
+        local_io = get_local_io()
+        local_io.archive_rows(
+            local_io.get_spark(),
+            IO_BACKEND["root"],
+            "raw_data",
+            f"file_create_time < '{cutoff}'",
+            get_s3_path(BUCKET_NAME, f"raw_data_archive/archived_at={archived_at}"),
+            "file_date",
+        )
+        for table in ["raw_data", "raw_data_view"]:
+            execute_statement(f"DELETE FROM {table} WHERE file_create_time < '{cutoff}'")
+        return
 
-    response = client.execute_statement(
-        ClusterIdentifier=cluster_id,
-        Database=database,
-        DbUser=db_user,
-        Sql=issue_graph_view_sql_query,
-    )
+    execute_transaction(make_raw_data_archive_sqls(timestamp, retention_days))
 
-    keyword_frequency_view_sql_query = f"""
-        create view keyword_frequency_view as
+    for table in ["raw_data", "raw_data_view"]:
+        for sql in [f"VACUUM {table} TO 99 PERCENT", f"ANALYZE {table}"]:
+            execute_statement(sql)
+
+
+def make_raw_data_merge_sqls(columns, staging_table=RAW_DATA_STAGING_TABLE):
+    """
+    스테이징 테이블의 게시글을 url 기준으로 raw_data에 병합하는 SQL
+    이전 시간대를 다시 처리해도 더 최신 값을 덮어쓰지 않도록 오래된 스테이징 행은 먼저 삭제
+    """
+    update_columns = [c for c in columns if c != "url"]
+
+    return [
+        f"DELETE FROM {staging_table} USING raw_data "
+        f"WHERE {staging_table}.url = raw_data.url "
+        f"AND raw_data.file_create_time > {staging_table}.file_create_time",
+        f"MERGE INTO raw_data USING {staging_table} ON raw_data.url = {staging_table}.url "
+        f"WHEN MATCHED THEN UPDATE SET "
+        + ", ".join(f"{c} = {staging_table}.{c}" for c in update_columns)
+        + f" WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) VALUES ("
+        + ", ".join(f"{staging_table}.{c}" for c in columns)
+        + ")",
+    ]
+
+
+def make_raw_data_view_merge_sqls(columns, staging_table=RAW_DATA_VIEW_STAGING_TABLE):
+    """
+    스테이징 테이블의 게시글로 raw_data_view의 같은 url 행을 바꾸는 SQL
+    raw_data_view는 게시글을 키워드마다 한 행으로 저장하므로 MERGE 대신 url의 모든 행을 지우고 추가
+    """
+    return [
+        f"DELETE FROM {staging_table} USING raw_data_view "
+        f"WHERE {staging_table}.url = raw_data_view.url "
+        f"AND raw_data_view.file_create_time > {staging_table}.file_create_time",
+        f"DELETE FROM raw_data_view USING {staging_table} "
+        f"WHERE raw_data_view.url = {staging_table}.url",
+        f"INSERT INTO raw_data_view ({', '.join(columns)}) "
+        f"SELECT {', '.join(columns)} FROM {staging_table}",
+    ]
+
+
+def make_staging_merge_sqls(data, columns):
+    # merge 모드에서 스테이징 테이블을 대상 테이블에 병합하는 SQL
+    if data == "view_raw_data_df":
+        return make_raw_data_view_merge_sqls(columns)
+    return make_raw_data_merge_sqls(columns)
+
+
+# 대시보드 뷰 쿼리
+# issue_graph는 EMR에서 과거 이슈마다 시간을 맞춰 저장하므로 뷰는 테이블을 그대로 보여줌
+ISSUE_GRAPH_VIEW_QUERY = """
+        select created_at, past_issue_name, past_issueization, past_sentiment,
+            current_keyword, current_issueization, num_of_comments, viewed, liked, sentiment
+        from issue_graph
+"""
+
+KEYWORD_FREQUENCY_VIEW_QUERY = """
         select current_keyword, sum(current_issueization) as frequency
         from current_issue
-        group by current_keyword;
+        group by current_keyword
+"""
+
+
+def delete_issue_graph_view_and_keyword_frequency_view():
+
+    execute_statement("DROP VIEW IF EXISTS issue_graph_view;")
+
+    execute_statement("DROP VIEW IF EXISTS keyword_frequency_view;")
+
+
+def create_issue_graph_view_and_keyword_frequency_view():
+
+    execute_statement(
+        f"""
+        create view issue_graph_view as
+        {ISSUE_GRAPH_VIEW_QUERY}
+    """
+    )
+
+    execute_statement(
+        f"""
+        create view keyword_frequency_view as
+        {KEYWORD_FREQUENCY_VIEW_QUERY}
         """
+    )
+
+
+"""
+    -- S3 스테이징 후 한 번에 COPY 하는 적재와 관련된 함수 --
+
+    stage_to_s3(df, data, run_id)
+        - DataFrame을 CSV GZIP으로 스테이징 경로에 쓰기
+    stage_all(dfs, run_id, workers)
+        - 여러 DataFrame을 스레드 풀에서 동시에 스테이징
+    make_copy_sql(data, path, columns, table=None)
+        - 스테이징 파일을 테이블로 COPY 하는 SQL, table이 주어지면 해당 테이블(스테이징 테이블)로 COPY
+    execute_transaction(sqls)
+        - redshift-data batch_execute_statement로 하나의 트랜잭션 실행 후 완료까지 대기
+    execute_statement(sql)
+        - redshift-data로 SQL 하나를 실행하고 완료까지 대기 (local 백엔드는 DELETE, 뷰만 실행)
+    fetch_from_redshift(sql)
+        - redshift-data로 작은 조회 결과를 바로 읽기
+    wait_for_statement(client, statement_id)
+        - describe_statement로 실행 상태 확인
+"""
+
+
+@instrument(key="data")
+def stage_to_s3(df, data, run_id):
+    path = f"{S3_STAGING_DIR}/{run_id}/{REDSHIFT_TABLES[data]}/"
+    print(f"stage {data} to {path}")
+
+    df.write.mode("overwrite").option("compression", "gzip").option(
+        "nullValue", STAGING_NULL_VALUE
+    ).option("escape", '"').option(
+        "timestampFormat", "yyyy-MM-dd HH:mm:ss"
+    ).csv(path)
+
+    return path, df.columns
+
+
+def stage_all(dfs, run_id, workers=DEFAULT_LOAD_WORKERS):
+    # 테이블끼리 서로 의존하지 않으므로 Spark job을 동시에 제출
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            data: executor.submit(stage_to_s3, df, data, run_id)
+            for data, df in dfs.items()
+        }
+
+        return {data: future.result() for data, future in futures.items()}
+
+
+def make_copy_sql(data, path, columns, table=None):
+    return f"""
+        COPY {table or REDSHIFT_TABLES[data]} ({", ".join(columns)})
+        FROM '{path}'
+        IAM_ROLE '{REDSHIFT_IAM_ROLE}'
+        FORMAT AS CSV GZIP
+        NULL AS '{STAGING_NULL_VALUE}'
+        TIMEFORMAT 'auto'
+    """
+
+
+def wait_for_statement(client, statement_id, poll_interval=2):
+    while True:
+        response = client.describe_statement(Id=statement_id)
+        status = response["Status"]
+
+        if status == "FINISHED":
+            return response
+        if status in ("FAILED", "ABORTED"):
+            raise RuntimeError(
+                f"Redshift statement {statement_id} {status}: {response.get('Error')}"
+            )
+
+        time.sleep(poll_interval)
+
+
+def fetch_from_redshift(sql):
+    client = boto3.client("redshift-data", region_name=REDSHIFT_REGION)
+
+    response = client.execute_statement(
+        ClusterIdentifier=REDSHIFT_CLUSTER_ID,
+        Database=REDSHIFT_DATABASE,
+        DbUser=REDSHIFT_DB_USER,
+        Sql=sql,
+    )
+    wait_for_statement(client, response["Id"])
+
+    return client.get_statement_result(Id=response["Id"])["Records"]
+
+
+def execute_statement(sql):
+    if is_local():
+        local_io = get_local_io()
+        return local_io.execute(local_io.get_spark(), IO_BACKEND["root"], sql)
+
+    client = boto3.client("redshift-data", region_name=REDSHIFT_REGION)
 
     response = client.execute_statement(
-        ClusterIdentifier=cluster_id,
-        Database=database,
-        DbUser=db_user,
-        Sql=keyword_frequency_view_sql_query,
+        ClusterIdentifier=REDSHIFT_CLUSTER_ID,
+        Database=REDSHIFT_DATABASE,
+        DbUser=REDSHIFT_DB_USER,
+        Sql=sql,
+    )
+
+    return wait_for_statement(client, response["Id"])
+
+
+def execute_transaction(sqls):
+    client = boto3.client("redshift-data", region_name=REDSHIFT_REGION)
+
+    # batch_execute_statement의 SQL들은 하나의 트랜잭션으로 실행됨
+    response = client.batch_execute_statement(
+        ClusterIdentifier=REDSHIFT_CLUSTER_ID,
+        Database=REDSHIFT_DATABASE,
+        DbUser=REDSHIFT_DB_USER,
+        Sqls=sqls,
     )
 
+    return wait_for_statement(client, response["Id"])
+
+
+"""
+    -- I/O 백엔드와 관련된 함수 (--io_backend local이면 local_io.py 사용) --
+
+    is_local()
+    get_local_io()
+        - local 백엔드에서만 필요하므로 사용할 때 import
+    list_s3_objects(bucket, prefix)
+        - boto3 list_objects의 Contents
+    get_s3_path(bucket, key)
+        - Spark에서 읽을 경로 (s3a:// 또는 로컬 경로)
+    read_s3_object(bucket, key)
+        - 객체가 없으면 None
+    write_s3_object(bucket, key, body)
+    publish_alarm(message)
+        - SNS로 알림 전송
+"""
+
+
+def is_local():
+    return IO_BACKEND["backend"] == "local"
+
+
+def get_local_io():
+    import local_io
+
+    return local_io
+
+
+def list_s3_objects(bucket, prefix):
+    if is_local():
+        return get_local_io().list_objects(IO_BACKEND["root"], bucket, prefix)
+
+    s3 = boto3.client("s3")
+    return s3.list_objects(Bucket=bucket, Prefix=prefix).get("Contents", [])
+
+
+def get_s3_path(bucket, key):
+    if is_local():
+        return get_local_io().get_object_path(IO_BACKEND["root"], bucket, key)
+
+    return f"s3a://{bucket}/{key}"
+
+
+def read_s3_object(bucket, key):
+    if is_local():
+        return get_local_io().read_object(IO_BACKEND["root"], bucket, key)
+
+    s3 = boto3.client("s3")
+    try:
+        return s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+    except s3.exceptions.NoSuchKey:
+        return None
+
+
+def write_s3_object(bucket, key, body):
+    if is_local():
+        return get_local_io().write_object(IO_BACKEND["root"], bucket, key, body)
+
+    s3 = boto3.client("s3")
+    s3.put_object(Bucket=bucket, Key=key, Body=body)
+
+
+def publish_alarm(message):
+    if is_local():
+        return get_local_io().publish(IO_BACKEND["root"], message)
+
+    client = boto3.client("sns", region_name="ap-northeast-2")
+    client.publish(
+        TargetArn="<ARN>",
+        Message=json.dumps(message),
+    )
+
+
+"""
+    -- 중간 결과 재사용과 관련된 함수 --
+
+    materialize(spark, df, stage)
+        - 설정에 따라 단계 결과를 persist 하고 계산 횟수를 기록
+    release(*stages)
+        - load가 끝난 단계 결과 unpersist
+    get_stage_computations()
+        - 단계별 계산 횟수, 파티션 계산 횟수
+"""
+
+
+def track_computations(spark, df, stage):
+    # 파티션이 계산될 때마다 accumulator를 올리는 통과용 단계
+    # 0번 파티션은 단계 전체가 계산될 때마다 한 번씩 계산되므로 단계 계산 횟수로 사용
+    partitions = spark.sparkContext.accumulator(0)
+    passes = spark.sparkContext.accumulator(0)
+    STAGE_COMPUTATIONS[stage] = (partitions, passes)
+
+    def count_partition(batches):
+        partitions.add(1)
+        if TaskContext.get().partitionId() == 0:
+            passes.add(1)
+        yield from batches
+
+    return df.mapInPandas(count_partition, schema=df.schema)
+
+
+def materialize(spark, df, stage):
+    if MATERIALIZATION["track"]:
+        df = track_computations(spark, df, stage)
+
+    if stage in MATERIALIZATION["stages"]:
+        df = df.persist(getattr(StorageLevel, MATERIALIZATION["storage_level"]))
+        PERSISTED_DFS[stage] = df
+
+    return df
+
+
+def release(*stages):
+    for stage in stages:
+        if stage in PERSISTED_DFS:
+            PERSISTED_DFS.pop(stage).unpersist()
+
+
+def get_stage_computations():
+    return {
+        stage: {
+            "computations": passes.value,
+            "partition_computations": partitions.value,
+        }
+        for stage, (partitions, passes) in STAGE_COMPUTATIONS.items()
+    }
+
 
 """
     -- transform과 관련된 함수 --
@@ -309,35 +1104,75 @@ def create_issue_graph_view_and_keyword_frequency_view():
     make_raw_df(df, timestamp)
         - 2달치 가져온 데이터 타입 변환
 
+    normalize_keywords(keywords)
+        - 키워드 배열의 공백 제거, 소문자 변환 후 중복 제거 ('아이오닉 6', '아이오닉6' -> '아이오닉6')
+
     make_keyword_df(df)
-        - 현재 2일치 키워드 추출
+        - 현재 2일치 키워드 추출 (정규화)
+
+    make_keyword_dictionary_df(spark, keyword_df)
+        - 이번 실행의 키워드에 정수 id를 붙인 사전, 이후 (시간, 키워드) 조인과 집계는 id로 함
+
+    decode_keywords(df, keyword_dictionary_df)
+        - keyword_id 컬럼을 같은 위치의 current_keyword 문자열로 되돌림
 
-    make_raw_data_df(spark)
+    make_raw_data_df(spark, columns=None, predicate=None)
         - 현재 2일치 데이터 저장하도록 변환
-     
-    make_issue_df(keyword_df, raw_data_df, start_date, end_date)
-        - 현재 이슈화를 계산할 df 생성
 
-    make_time_keywords_df(spark, keyword_df, start_date, end_date)
-        - 그래프 비교하기위해 시간 보정
+    make_new_raw_data_df(df, timestamp)
+        - 이번에 들어온 데이터만 키워드 단위로 펼치기 (증분 모드)
+
+    sum_by_keys(df, keys, columns, salt_buckets=None)
+        - keys 단위 columns 합계, salt_buckets > 0 이면 salt를 붙여 2단계로 집계 (키워드 쏠림 처리)
+
+    make_issue_rollup_df(raw_data_df, start_date, end_date)
+        - 분석 기간 전체를 (시간, 키워드) 단위로 집계 (전체 모드)
+
+    make_incremental_issue_rollup_df(spark, new_issue_rollup_df, start_date, end_date)
+        - 저장된 (시간, 키워드) 집계에 새 시간대 집계를 병합 (증분 모드)
+
+    make_issue_df(keyword_dictionary_df, issue_rollup_df, start_date, bucket_minutes)
+        - 이번 실행의 키워드만 id로 바꿔 (시간 그리드, 키워드) 단위로 다시 합친 뒤 현재 이슈화를 계산할 df 생성
+
+    make_time_keywords_df(spark, keyword_dictionary_df, start_date, end_date, bucket_minutes)
+        - 그래프 비교하기위해 시간 보정 (bucket_minutes 간격)
 
     make_current_issue_df(time_keywords_df, issue_df) 
-        - 한시간 단위로 키워드 이슈화 계산
+        - 시간 그리드 단위로 키워드 이슈화 계산
+
+    make_sparse_current_issue_df(issue_df)
+        - 값이 있는 (시간, 키워드) 셀만 남긴 이슈화 (sparse 모드)
     
     make_frequency_df(current_issue_df)
         - 두달동안의 이슈화 정도 계산
     
-    get_similarity(spark, current_issue_df)
-        - 과거 이슈와 현재 키워드 유사도 비교
+    make_keyword_series_df(current_issue_df, keyword_dictionary_df, timestamp, window_hours, bucket_minutes)
+        - 키워드별 시간 순서가 보장된 분석 기간 길이의 1시간 단위 이슈화 배열 생성
+
+    make_past_issue_signatures(spark)
+        - past_issue를 읽어 과거 이슈별 DTW 전처리 결과(시그니처) 생성
+
+    get_past_issue_signatures(spark)
+        - past_issue가 바뀌지 않았으면 S3에 저장된 시그니처를 읽고, 바뀌었으면 다시 만들어 저장
+
+    get_similarity(spark, current_issue_df, keyword_dictionary_df, timestamp, top_k, windows, window_hours, bucket_minutes)
+        - 과거 이슈와 현재 키워드 유사도 비교, top_k > 0 이면 키워드마다 기간(windows)별로 가장 유사한 k개만
+
+    make_issue_graph_df(spark, current_issue_df, window_start, window_end)
+        - 과거 이슈마다 시작 시간을 분석 기간의 시작 시간에 맞춰 미리 정렬한 그래프 데이터
 """
 
 
+@instrument()
 def make_raw_df(df, timestamp):
 
     df = df.withColumn("file_create_time", lit(timestamp))
 
     df = df.withColumn("comments", col("comments").cast("string"))
-    df = df.withColumn("keywords", col("keywords").cast("string"))
+    # raw_data에서 from_json으로 다시 읽을 수 있도록 키워드 배열은 JSON 배열 문자열로 저장
+    # (키워드 단위로 펼친 뒤 호출하면 이미 문자열)
+    if isinstance(df.schema["keywords"].dataType, ArrayType):
+        df = df.withColumn("keywords", F.to_json(col("keywords")))
     df = df.withColumn("created_at", col("created_at").cast("timestamp"))
     df = df.withColumn("file_create_time", col("file_create_time").cast("timestamp"))
     df = df.withColumn("viewed", col("viewed").cast("integer"))
@@ -363,10 +1198,25 @@ def make_raw_df(df, timestamp):
     return raw_df
 
 
+def normalize_keyword(keyword):
+    # 공백을 모두 지우고 소문자로 ('아이오닉 6' -> '아이오닉6', 'G80' -> 'g80')
+    return F.lower(F.regexp_replace(keyword, r"\s+", ""))
+
+
+def normalize_keywords(keywords):
+    # 정규화 후 같아진 키워드는 게시글마다 한 번만 세고, 빈 키워드는 제외
+    return F.array_distinct(
+        F.filter(F.transform(keywords, normalize_keyword), lambda keyword: keyword != "")
+    )
+
+
+@instrument()
 def make_keyword_df(df):
 
-    # `keyword` 컬럼을 explode하여 모든 키워드를 행으로 펼치기
-    exploded_df = df.select(explode(col("keywords")).alias("current_keyword"))
+    # 정규화한 `keyword` 컬럼을 explode하여 모든 키워드를 행으로 펼치기
+    exploded_df = df.select(
+        explode(normalize_keywords(col("keywords"))).alias("current_keyword")
+    )
 
     # 유니크한 키워드만 포함된 DataFrame을 생성
     keyword_df = exploded_df.select("current_keyword").distinct()
@@ -374,16 +1224,34 @@ def make_keyword_df(df):
     return keyword_df
 
 
-def make_raw_data_df(spark):
-    raw_data_df = read_from_redshift(spark, "raw_data_df")
+@instrument()
+def make_keyword_dictionary_df(spark, keyword_df):
+    # 이번 실행의 키워드는 수천 개 이하이므로 드라이버로 한 번 모아 키워드 순서대로 0부터 id를 붙임
+    # 로컬 데이터로 만든 DataFrame이라 다시 계산되지 않고 조인에서 브로드캐스트됨
+    keywords = sorted(row["current_keyword"] for row in keyword_df.collect())
+
+    return spark.createDataFrame(list(enumerate(keywords)), KEYWORD_DICTIONARY_SCHEMA)
+
+
+def decode_keywords(df, keyword_dictionary_df):
+    # 적재하거나 알림을 보내기 전에 keyword_id를 같은 위치의 current_keyword로 바꿈
+    columns = ["current_keyword" if c == "keyword_id" else c for c in df.columns]
+
+    return df.join(broadcast(keyword_dictionary_df), on="keyword_id").select(*columns)
+
+
+@instrument()
+def make_raw_data_df(spark, columns=None, predicate=None):
+    raw_data_df = read_from_redshift(spark, "raw_data_df", columns, predicate)
 
     all_columns = raw_data_df.columns
     raw_data_df = raw_data_df.withColumn(
         "keywords", from_json(col("keywords"), ArrayType(StringType()))
     )
-    # `keyword` 컬럼을 explode하여 모든 키워드를 행으로 펼치기
+    # 정규화한 `keyword` 컬럼을 explode하여 모든 키워드를 행으로 펼치기
+    # 정규화 전에 저장된 행도 읽을 때 정규화하므로 같은 키워드의 변형이 한 시계열로 합쳐짐
     raw_data_df = raw_data_df.select(
-        explode(col("keywords")).alias("keywords"),
+        explode(normalize_keywords(col("keywords"))).alias("keywords"),
         *[
             col(c) for c in all_columns if c != "keywords"
         ],  # 'keywords' 컬럼을 제외한 나머지 모든 컬럼
@@ -392,75 +1260,154 @@ def make_raw_data_df(spark):
     return raw_data_df
 
 
-def make_issue_df(keyword_df, raw_data_df, start_date, end_date):
+@instrument()
+def make_new_raw_data_df(df, timestamp):
+    # 이번에 들어온 데이터만 키워드 단위로 펼치기 (make_raw_data_df와 같은 컬럼 순서)
+    new_raw_data_df = make_raw_df(
+        df.withColumn("keywords", explode(normalize_keywords(col("keywords")))), timestamp
+    )
 
-    joined_df = raw_data_df.join(
-        broadcast(keyword_df),
-        raw_data_df["keywords"] == keyword_df["current_keyword"],
+    all_columns = new_raw_data_df.columns
+    new_raw_data_df = new_raw_data_df.select(
+        col("keywords"), *[col(c) for c in all_columns if c != "keywords"]
     )
 
-    filtered_df = joined_df.filter(
-        (col("file_create_time") >= start_date) & (col("file_create_time") <= end_date)
+    return new_raw_data_df
+
+
+def sum_by_keys(df, keys, columns, salt_buckets=None):
+    salt_buckets = SKEW["salt_buckets"] if salt_buckets is None else salt_buckets
+    if salt_buckets <= 0:
+        return df.groupBy(*keys).agg(*[sum(c).alias(c) for c in columns])
+
+    # 행 내용의 해시로 salt를 정해 task를 다시 실행해도 같은 파티션으로 감
+    salt = F.pmod(F.xxhash64(*df.columns), lit(salt_buckets))
+    partial_df = (
+        df.withColumn("salt", salt)
+        .groupBy(*keys, "salt")
+        .agg(*[sum(c).alias(c) for c in columns])
     )
 
-    issue_df = (
-        filtered_df.groupBy("file_create_time", "current_keyword")
-        .agg(
-            {
-                "num_of_comments": "sum",
-                "viewed": "sum",
-                "liked": "sum",
-                "sentiment": "sum",
-            }
-        )
-        .withColumnRenamed("sum(num_of_comments)", "num_of_comments")
-        .withColumnRenamed("sum(viewed)", "viewed")
-        .withColumnRenamed("sum(liked)", "liked")
-        .withColumnRenamed("sum(sentiment)", "sentiment")
+    return partial_df.groupBy(*keys).agg(*[sum(c).alias(c) for c in columns])
+
+
+def aggregate_issue_rollup(raw_data_df):
+    # (시간, 키워드) 단위로 조회수, 추천수, 댓글수, 감정 점수 합계
+    issue_rollup_df = sum_by_keys(
+        raw_data_df.withColumnRenamed("keywords", "current_keyword"),
+        ["file_create_time", "current_keyword"],
+        ISSUE_AGG_COLUMNS,
     )
 
-    issue_df = issue_df.withColumn(
-        "current_issueization",
-        issueization_udf(col("num_of_comments"), col("viewed"), col("liked")),
+    return issue_rollup_df
+
+
+@instrument()
+def make_issue_rollup_df(raw_data_df, start_date, end_date):
+
+    filtered_df = raw_data_df.filter(
+        (col("file_create_time") >= start_date) & (col("file_create_time") <= end_date)
     )
 
-    issue_df = issue_df.orderBy("file_create_time")
+    return aggregate_issue_rollup(filtered_df)
+
+
+@instrument()
+def make_incremental_issue_rollup_df(spark, new_issue_rollup_df, start_date, end_date):
+    # 저장된 집계에서 이번 시간대(end_date)를 제외하고 새로 집계한 시간대를 합침
+    issue_rollup_df = read_from_redshift(spark, "issue_rollup")
+
+    issue_rollup_df = issue_rollup_df.filter(
+        (col("file_create_time") >= start_date) & (col("file_create_time") < end_date)
+    ).select(
+        "file_create_time",
+        # 정규화 전에 저장된 집계도 make_issue_df에서 정규화된 키워드로 합쳐지도록
+        normalize_keyword(col("current_keyword")).alias("current_keyword"),
+        *ISSUE_AGG_COLUMNS,
+    )
+
+    return issue_rollup_df.unionByName(new_issue_rollup_df)
+
+
+@instrument()
+def make_issue_df(
+    keyword_dictionary_df,
+    issue_rollup_df,
+    start_date,
+    bucket_minutes=DEFAULT_BUCKET_MINUTES,
+):
+
+    # 이번 실행의 키워드만 남기고 정수 id로 바꿈 (다시 합치는 셔플 전에 다른 키워드를 거름)
+    issue_rollup_df = issue_rollup_df.join(
+        broadcast(keyword_dictionary_df), on="current_keyword"
+    ).drop("current_keyword")
+
+    # file_create_time을 시간 그리드로 내린 뒤 (시간, 키워드) 단위로 다시 합침
+    # 1시간 간격에 정각마다 들어온 집계는 그대로 유지되고, 그리드 사이에 들어온 집계는 이전 칸에 합쳐짐
+    issue_rollup_df = issue_rollup_df.withColumn(
+        "file_create_time",
+        to_bucket_time(
+            to_timestamp(col("file_create_time"), "yyyy-MM-dd HH:mm:ss"),
+            start_date,
+            bucket_minutes,
+        ),
+    )
+    issue_df = sum_by_keys(
+        issue_rollup_df, ["file_create_time", "keyword_id"], ISSUE_AGG_COLUMNS
+    )
 
     issue_df = issue_df.withColumn(
-        "file_create_time", to_timestamp(col("file_create_time"), "yyyy-MM-dd HH:mm:ss")
+        "current_issueization",
+        get_issue_score_column(
+            viewed=col("viewed"),
+            liked=col("liked"),
+            num_of_comments=col("num_of_comments"),
+        ),
     )
 
     return issue_df
 
 
-def make_time_keywords_df(spark, keyword_df, start_date, end_date):
+@instrument()
+def make_time_keywords_df(
+    spark,
+    keyword_dictionary_df,
+    start_date,
+    end_date,
+    bucket_minutes=DEFAULT_BUCKET_MINUTES,
+):
 
-    # 전체 시간 범위를 생성 (1시간 단위)
+    # 전체 시간 범위를 생성 (bucket_minutes 단위)
     time_range_df = spark.range(0, 1).select(
-        explode(sequence(start_date, end_date, expr("INTERVAL 1 HOUR"))).alias(
-            "file_create_time"
-        )
+        explode(
+            sequence(
+                start_date,
+                end_date,
+                expr(f"INTERVAL {bucket_minutes} MINUTES"),
+            )
+        ).alias("file_create_time")
     )
 
     # 시간 범위와 키워드 조합
-    time_keywords_df = time_range_df.crossJoin(keyword_df)
+    time_keywords_df = time_range_df.crossJoin(keyword_dictionary_df.select("keyword_id"))
     time_keywords_df = time_keywords_df.withColumn("current_issueization", lit(0))
 
     return time_keywords_df
 
 
+@instrument()
 def make_current_issue_df(time_keywords_df, issue_df):
 
     joined_df = time_keywords_df.alias("tk").join(
         issue_df.alias("i"),
         (col("tk.file_create_time") == col("i.file_create_time"))
-        & (col("tk.current_keyword") == col("i.current_keyword")),
+        & (col("tk.keyword_id") == col("i.keyword_id")),
         "left",
     )
 
     current_issue_df = joined_df.select(
         col("tk.file_create_time").alias("created_at"),
-        col("tk.current_keyword"),
+        col("tk.keyword_id"),
         col("i.current_issueization").alias("current_issueization"),
         col("i.num_of_comments"),
         col("i.viewed"),
@@ -480,115 +1427,482 @@ def make_current_issue_df(time_keywords_df, issue_df):
 
     current_issue_df = current_issue_df.withColumn(
         "current_issueization",
-        issueization_udf(col("viewed"), col("liked"), col("num_of_comments")),
+        get_issue_score_column(col("viewed"), col("liked"), col("num_of_comments")),
+    )
+
+    return current_issue_df
+
+
+@instrument()
+def make_sparse_current_issue_df(issue_df):
+    # 이슈화 값이 있는 (시간, 키워드) 셀만 남김, 빈 시간은 유사도 계산이나 대시보드에서 0으로 채움
+    current_issue_df = issue_df.select(
+        col("file_create_time").alias("created_at"),
+        col("keyword_id"),
+        col("current_issueization"),
+        col("num_of_comments"),
+        col("viewed"),
+        col("liked"),
+        col("sentiment"),
+    )
+
+    # 모든 게시글의 값이 null인 셀은 합계도 null이므로 dense 모드와 같이 0으로 채운 뒤 이슈화 값을 다시 계산
+    current_issue_df = current_issue_df.fillna(
+        {
+            "num_of_comments": 0,
+            "viewed": 0,
+            "liked": 0,
+            "sentiment": 0,
+        }
     )
 
-    current_issue_df = current_issue_df.orderBy("created_at")
+    current_issue_df = current_issue_df.withColumn(
+        "current_issueization",
+        get_issue_score_column(col("viewed"), col("liked"), col("num_of_comments")),
+    )
 
     return current_issue_df
 
 
+@instrument()
 def make_frequency_df(current_issue_df):
-    # current_keyword로 그룹화하고 current_issueization의 합계에 로그 적용
-    frequency_df = current_issue_df.groupBy("current_keyword").agg(
-        F.log(sum("current_issueization") + 1).alias(
+    # keyword_id로 그룹화하고 current_issueization의 합계에 로그 적용
+    frequency_df = sum_by_keys(
+        current_issue_df, ["keyword_id"], ["current_issueization"]
+    ).select(
+        "keyword_id",
+        F.log(col("current_issueization") + 1).alias(
             "total_frequency"
-        )  # +1을 하는 이유는 로그 계산에서 0을 방지하기 위해서
+        ),  # +1을 하는 이유는 로그 계산에서 0을 방지하기 위해서
     )
 
     return frequency_df
 
 
-def get_current_issue_and_raw_data(spark, df, timestamp):
+def get_current_issue_and_raw_data(
+    spark,
+    df,
+    timestamp,
+    issue_mode="full",
+    grid_mode="dense",
+    raw_data_mode=DEFAULT_RAW_DATA_MODE,
+    window_hours=DEFAULT_WINDOW_HOURS,
+    bucket_minutes=DEFAULT_BUCKET_MINUTES,
+):
 
+    window_start, window_end = get_analysis_window(timestamp, window_hours)
     end_date = to_timestamp(lit(timestamp), "yyyy-MM-dd HH:mm:ss")
-    start_date = date_sub(end_date, 62)
+    start_date = lit(str(window_start)).cast("timestamp")
 
     raw_df = make_raw_df(df, timestamp)
 
     keyword_df = make_keyword_df(df)
 
-    raw_data_df = make_raw_data_df(spark)
+    # 키워드를 한 번만 정수 id로 바꿔 (시간, 키워드) 조인과 집계에 사용
+    keyword_dictionary_df = make_keyword_dictionary_df(spark, keyword_df)
+
+    new_raw_data_df = make_new_raw_data_df(df, timestamp)
 
-    view_raw_data_df = raw_data_df.withColumn(
+    if issue_mode == "incremental":
+        # 새로 들어온 파일만 집계한 뒤 저장된 (시간, 키워드) 집계와 병합
+        new_issue_rollup_df = aggregate_issue_rollup(new_raw_data_df)
+
+        issue_rollup_df = make_incremental_issue_rollup_df(
+            spark, new_issue_rollup_df, start_date, end_date
+        )
+    else:
+        # 분석 기간의 숫자 컬럼만 UNLOAD 해서 다시 집계하고 (시간, 키워드) 집계 테이블을 새로 만듦
+        # 이번 시간대는 raw_data 적재 시점과 상관없이 새로 들어온 데이터로만 집계
+        predicate = f"file_create_time >= '{window_start}' AND file_create_time < '{window_end}'"
+        if raw_data_mode == "merge":
+            # 다시 수집된 게시글은 이번 시간대 값만 세도록 저장된 행을 제외
+            raw_data_df = make_raw_data_df(
+                spark, columns=[*ISSUE_RAW_DATA_COLUMNS, "url"], predicate=predicate
+            )
+            raw_data_df = raw_data_df.join(
+                df.select("url"), on="url", how="left_anti"
+            ).select(*ISSUE_RAW_DATA_COLUMNS)
+        else:
+            raw_data_df = make_raw_data_df(
+                spark, columns=ISSUE_RAW_DATA_COLUMNS, predicate=predicate
+            )
+        raw_data_df = raw_data_df.unionByName(
+            new_raw_data_df.select(*ISSUE_RAW_DATA_COLUMNS)
+        )
+
+        issue_rollup_df = make_issue_rollup_df(raw_data_df, start_date, end_date)
+
+        if window_hours > 0:
+            # 짧은 기간의 집계로 긴 기간의 issue_rollup을 덮어쓰지 않도록 새 시간대만 추가
+            new_issue_rollup_df = aggregate_issue_rollup(new_raw_data_df)
+        else:
+            new_issue_rollup_df = issue_rollup_df
+
+    # raw_data_view에는 이번에 들어온 게시글만 추가 (merge 모드에서는 url 기준으로 병합)
+    view_raw_data_df = new_raw_data_df.withColumn(
         "content", substring(col("content"), 1, 255)
     ).withColumn("comments", substring(col("comments"), 1, 255))
 
-    issue_df = make_issue_df(keyword_df, raw_data_df, start_date, end_date)
+    issue_df = make_issue_df(
+        keyword_dictionary_df, issue_rollup_df, start_date, bucket_minutes
+    )
 
-    time_keywords_df = make_time_keywords_df(spark, keyword_df, start_date, end_date)
+    if grid_mode == "sparse":
+        current_issue_df = make_sparse_current_issue_df(issue_df)
+    else:
+        time_keywords_df = make_time_keywords_df(
+            spark, keyword_dictionary_df, start_date, end_date, bucket_minutes
+        )
 
-    current_issue_df = make_current_issue_df(time_keywords_df, issue_df)
+        current_issue_df = make_current_issue_df(time_keywords_df, issue_df)
 
-    frequency_df = make_frequency_df(current_issue_df)
+    # 빈도, 유사도, load에서 여러 번 쓰이므로 한 번만 계산되도록 persist
+    current_issue_df = materialize(spark, current_issue_df, "current_issue")
 
-    return raw_df, view_raw_data_df, current_issue_df, frequency_df
+    frequency_df = materialize(
+        spark,
+        decode_keywords(make_frequency_df(current_issue_df), keyword_dictionary_df),
+        "frequency",
+    )
 
+    return (
+        raw_df,
+        view_raw_data_df,
+        current_issue_df,
+        frequency_df,
+        new_issue_rollup_df,
+        keyword_dictionary_df,
+    )
 
-def get_similarity(spark, current_issue_df):
 
-    keyword_issueization_df = current_issue_df.groupBy("current_keyword").agg(
-        collect_list("current_issueization").alias("current_issueization")
+@instrument()
+def make_keyword_series_df(
+    current_issue_df,
+    keyword_dictionary_df,
+    timestamp,
+    window_hours=DEFAULT_WINDOW_HOURS,
+    bucket_minutes=DEFAULT_BUCKET_MINUTES,
+):
+    # 키워드별로 시간 순서가 보장된 분석 기간 길이의 이슈화 배열 생성
+    # collect_list는 순서를 보장하지 않으므로 (시간 인덱스 -> 값) 맵을 만든 뒤 인덱스 순서대로 꺼냄
+    # dense, sparse 모드 모두 사용하며 sparse 모드의 빈 시간은 0으로 채움
+    # 과거 이슈가 1시간 단위이므로 1시간보다 짧은 간격은 1시간 단위로 합침
+    window_start, window_end = get_analysis_window(timestamp, window_hours)
+    num_hours = int((window_end - window_start).total_seconds() // 3600) + 1
+
+    # 시간 그리드와 일치하는 셀만 사용
+    seconds = col("created_at").cast("long") - lit(str(window_start)).cast(
+        "timestamp"
+    ).cast("long")
+
+    hourly_df = current_issue_df.filter(seconds % (bucket_minutes * 60) == 0).select(
+        "keyword_id",
+        (seconds / 3600).cast("int").alias("hour_index"),
+        col("current_issueization").cast("double").alias("current_issueization"),
     )
+    if bucket_minutes < 60:
+        hourly_df = sum_by_keys(
+            hourly_df, ["keyword_id", "hour_index"], ["current_issueization"]
+        )
+
+    keyword_series_df = (
+        hourly_df.groupBy("keyword_id")
+        .agg(
+            F.map_from_entries(
+                collect_list(F.struct("hour_index", "current_issueization"))
+            ).alias("issueization_by_hour")
+        )
+        .select(
+            "keyword_id",
+            expr(
+                f"transform(sequence(0, {num_hours - 1}), "
+                f"i -> coalesce(issueization_by_hour[i], cast(0 as double)))"
+            ).alias("current_issueization"),
+        )
+    )
+
+    # 유사도 결과에 키워드 문자열이 들어가도록 키워드당 한 행인 배열에서 되돌림
+    return decode_keywords(keyword_series_df, keyword_dictionary_df)
+
+
+def make_past_issue_signatures(spark):
 
     past_issue_df = read_from_redshift(spark, "past_issue")
 
-    keyword_issueization_df2 = past_issue_df.groupBy("past_issue_name").agg(
-        collect_list("past_issueization").alias("past_issueization")
+    # 과거 이슈도 created_at 순서로 정렬된 배열로 만듦
+    past_issue_rows = (
+        past_issue_df.groupBy("past_issue_name")
+        .agg(
+            F.sort_array(
+                collect_list(F.struct("created_at", "past_issueization"))
+            ).alias("past_issueization")
+        )
+        .select("past_issue_name", col("past_issueization.past_issueization"))
+        .orderBy("past_issue_name")
+        .collect()
+    )
+
+    return make_signatures(
+        [row["past_issue_name"] for row in past_issue_rows],
+        [row["past_issueization"] for row in past_issue_rows],
     )
 
-    broadcast_df2 = broadcast(keyword_issueization_df2)
 
-    similar_df = keyword_issueization_df.crossJoin(broadcast_df2).withColumn(
-        "similarity_degree",
-        dtw_similarity_score_udf(col("past_issueization"), col("current_issueization")),
+def get_past_issue_signatures(spark):
+
+    if is_local():
+        records = get_local_io().get_table_fingerprint(
+            spark, IO_BACKEND["root"], "past_issue"
+        )
+    else:
+        records = fetch_from_redshift(PAST_ISSUE_FINGERPRINT_QUERY)
+    fingerprint = json.dumps(records)
+
+    body = read_s3_object(SIGNATURE_BUCKET, SIGNATURE_KEY)
+    if body is not None:
+        signatures = load_signatures(io.BytesIO(body))
+        if (
+            signatures["version"] == SIGNATURE_VERSION
+            and signatures["fingerprint"] == fingerprint
+        ):
+            print(f"reuse past issue signatures ({len(signatures['names'])} issues)")
+            return signatures
+
+    # past_issue가 바뀌었거나 저장된 시그니처가 없으면 다시 만들어 저장
+    signatures = make_past_issue_signatures(spark)
+    buffer = io.BytesIO()
+    save_signatures(signatures, buffer, fingerprint)
+    write_s3_object(SIGNATURE_BUCKET, SIGNATURE_KEY, buffer.getvalue())
+    print(f"rebuild past issue signatures ({len(signatures['names'])} issues)")
+
+    return signatures
+
+
+@instrument()
+def get_similarity(
+    spark,
+    current_issue_df,
+    keyword_dictionary_df,
+    timestamp,
+    top_k=DEFAULT_SIMILARITY_TOP_K,
+    windows=None,
+    window_hours=DEFAULT_WINDOW_HOURS,
+    bucket_minutes=DEFAULT_BUCKET_MINUTES,
+):
+
+    keyword_issueization_df = make_keyword_series_df(
+        current_issue_df, keyword_dictionary_df, timestamp, window_hours, bucket_minutes
     )
 
-    similar_df = similar_df.drop("current_issueization", "past_issueization")
+    # 과거 이슈는 수가 적으므로 드라이버에서 시그니처를 읽거나 만든 뒤 executor로 브로드캐스트
+    signatures = get_past_issue_signatures(spark)
+    past_issue_names = signatures["names"]
+    past_issue_signatures = spark.sparkContext.broadcast(signatures)
+
+    def similarity_batches(batches):
+        # Arrow 배치 단위로 받아 키워드 하나당 모든 과거 이슈와의 DTW를 한 번에 계산
+        for pdf in batches:
+            keywords, names, scores = [], [], []
+            for keyword, series in zip(
+                pdf["current_keyword"], pdf["current_issueization"]
+            ):
+                similarity_scores = batch_dtw_similarity_score(
+                    to_sparse_points(series),
+                    past_issue_signatures.value["points"],
+                    scale_factor=DTW_SCALE_FACTOR,
+                    radius=DTW_RADIUS,
+                )
+                keywords.extend([keyword] * len(past_issue_names))
+                names.extend(past_issue_names)
+                scores.extend(similarity_scores)
+
+            yield pd.DataFrame(
+                {
+                    "current_keyword": keywords,
+                    "past_issue_name": names,
+                    "similarity_degree": np.asarray(scores, dtype=np.float32),
+                }
+            )
+
+    def top_k_batches(batches):
+        # 키워드마다 기간별로 가장 유사한 과거 이슈 top_k개만 남김
+        # 키워드 그래프는 모두 같은 길이이므로 기간별 과거 이슈 구간은 파티션에서 한 번만 만들어 재사용
+        window_signatures = {}
+        for pdf in batches:
+            rows = []
+            for keyword, series in zip(
+                pdf["current_keyword"], pdf["current_issueization"]
+            ):
+                for result in search_similar_issues(
+                    series,
+                    past_issue_signatures.value,
+                    k=top_k,
+                    windows=windows,
+                    scale_factor=DTW_SCALE_FACTOR,
+                    radius=DTW_RADIUS,
+                    window_signatures=window_signatures,
+                ):
+                    rows.append(
+                        (
+                            keyword,
+                            result["past_issue_name"],
+                            result["similarity"],
+                            result["window"],
+                            result["rank"],
+                        )
+                    )
+
+            yield pd.DataFrame(
+                rows, columns=SIMILARITY_TOP_K_SCHEMA.fieldNames()
+            ).astype(
+                {
+                    "similarity_degree": np.float32,
+                    "window_hours": np.int32,
+                    "similarity_rank": np.int32,
+                }
+            )
+
+    if top_k > 0:
+        return keyword_issueization_df.mapInPandas(
+            top_k_batches, schema=SIMILARITY_TOP_K_SCHEMA
+        )
+
+    similar_df = keyword_issueization_df.mapInPandas(
+        similarity_batches, schema=SIMILARITY_SCHEMA
+    )
 
     return similar_df
 
 
-def extract(spark):
+@instrument()
+def make_issue_graph_df(spark, current_issue_df, window_start, window_end):
+
+    past_issue_df = read_from_redshift(spark, "past_issue")
+
+    # 과거 이슈마다 첫 시간을 분석 기간의 시작 시간으로 옮길 만큼의 초
+    # sparse 모드의 current_issue는 값이 있는 시간만 있으므로 min(created_at)이 아니라 분석 기간 기준으로 맞춤
+    # (유사도 계산의 make_keyword_series_df와 같은 기준)
+    anchor = lit(str(window_start)).cast("timestamp").cast("long")
+    offset_df = past_issue_df.groupBy("past_issue_name").agg(
+        (anchor - F.unix_timestamp(F.min("created_at"))).alias("offset")
+    )
+
+    aligned_past_issue_df = (
+        past_issue_df.join(broadcast(offset_df), on="past_issue_name")
+        .select(
+            (F.unix_timestamp("created_at") + col("offset"))
+            .cast("timestamp")
+            .alias("created_at"),
+            "past_issue_name",
+            "past_issueization",
+            "past_sentiment",
+        )
+        .filter(col("created_at") <= lit(str(window_end)).cast("timestamp"))
+    )
+
+    # 과거 이슈는 작으므로 브로드캐스트해서 키워드마다 과거 이슈의 모든 시간을 만든 뒤 현재 이슈를 붙임
+    # sparse 모드는 값이 있는 시간만 있으므로 left 조인 후 빈 시간은 dense 모드와 같이 0으로 채움
+    keywords_df = current_issue_df.select("current_keyword").distinct()
+    issue_graph_df = (
+        broadcast(aligned_past_issue_df)
+        .crossJoin(keywords_df)
+        .join(current_issue_df, on=["created_at", "current_keyword"], how="left")
+        .fillna(
+            0,
+            subset=[
+                "current_issueization",
+                "num_of_comments",
+                "viewed",
+                "liked",
+                "sentiment",
+            ],
+        )
+    )
+
+    return issue_graph_df.select(
+        "created_at",
+        "past_issue_name",
+        "past_issueization",
+        "past_sentiment",
+        "current_keyword",
+        "current_issueization",
+        "num_of_comments",
+        "viewed",
+        "liked",
+        "sentiment",
+    )
 
-    recent_time = None
 
-    # 전달된 매개변수 파싱
+def get_job_arg(name, default=None):
+    # spark-submit으로 전달된 매개변수 파싱 (--name value)
     for i, arg in enumerate(sys.argv):
-        if arg == "--recent_time":
-            recent_time = sys.argv[i + 1]
+        if arg == name and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+
+    return default
+
+
+def to_file_create_time(recent_time):
+    # 2024-08-10T14:00:00 -> 2024-08-10 14:00:00
+    # 로컬 경로는 Hadoop Path에서 ':'를 쓸 수 없으므로 2024-08-10T14-00-00 형식도 허용
+    date, _, time_part = recent_time.partition("T")
+
+    return f"{date} {time_part.replace('-', ':')}"
+
+
+def extract_parquet(spark, recent_time):
+    # 파티션 컬럼을 스키마로 지정해 타입 추론 없이 crawl_hour 파티션만 읽음
+    # 이후 단계에서 쓰는 컬럼만 읽으므로 이슈화 계산에서는 본문, 댓글을 읽지 않음
+    base_path = get_s3_path(BUCKET_NAME, PARQUET_DIRECTORY_PATH)
+
+    df = (
+        spark.read.schema(KEYWORD_PARQUET_SCHEMA)
+        .option("basePath", base_path)
+        .parquet(f"{base_path}/crawl_hour={recent_time}")
+        .drop("crawl_hour")
+    )
+    df = df.dropDuplicates(["url"])
+
+    timestamp = to_file_create_time(recent_time)
+
+    print(f"timestamp (file_create_time): {timestamp}")
+
+    return df, timestamp
+
+
+@instrument()
+def extract(spark):
+
+    recent_time = get_job_arg("--recent_time")
+    num_files = int(get_job_arg("--num_files", DEFAULT_NUM_FILES))
+    input_format = get_job_arg("--input_format", "jsonl")
 
     print(recent_time)
 
+    if input_format == "parquet":
+        return extract_parquet(spark, recent_time)
+
     prefix = f"{DIRECTORY_PATH}/{recent_time}"
 
     print(prefix)
 
-    s3 = boto3.client("s3")
-    file_list = s3.list_objects(Bucket=BUCKET_NAME, Prefix=prefix)["Contents"]
+    file_list = list_s3_objects(BUCKET_NAME, prefix)
     file_list.sort(key=lambda x: x["LastModified"], reverse=True)
-    keys = [file["Key"] for file in file_list][:4]
+    keys = [file["Key"] for file in file_list][:num_files]
 
     for key in keys:
         print(key)
 
-    # 첫 번째 파일 읽기
-    df = spark.read.json(f"s3a://{BUCKET_NAME}/{keys[0]}")
+    # 스키마 추론 없이 모든 파일을 한 번에 읽고 전체에서 한 번만 중복 제거
+    # 스키마와 맞지 않는 레코드가 있으면 바로 실패하도록 FAILFAST
+    df = (
+        spark.read.schema(KEYWORD_POST_SCHEMA)
+        .option("mode", "FAILFAST")
+        .json([get_s3_path(BUCKET_NAME, key) for key in keys])
+    )
     df = df.dropDuplicates(["url"])
-    df = df.withColumn("comments", col("comments").cast("string"))
-    if "modified_at" in df.columns:
-        df = df.drop("modified_at")
-
-    # 나머지 파일들을 union
-    for key in keys[1:]:
-        df2 = spark.read.json(f"s3a://{BUCKET_NAME}/{key}")
-        df2 = df2.dropDuplicates(["url"])
-        df2 = df2.withColumn("comments", col("comments").cast("string"))
-        if "modified_at" in df2.columns:
-            df2 = df2.drop("modified_at")
-        df = df.union(df2)
 
-    timestamp = keys[0].split("/")[-1].split(".")[0].split("_")[-1].replace("T", " ")
+    timestamp = to_file_create_time(keys[0].split("/")[-1].split(".")[0].split("_")[-1])
 
     print(f"timestamp (file_create_time): {timestamp}")
     print(f"data_source union df {df}")
@@ -596,31 +1910,231 @@ def extract(spark):
     return df, timestamp
 
 
-def transform(spark, df, timestamp):
+def transform(
+    spark,
+    df,
+    timestamp,
+    issue_mode="full",
+    grid_mode="dense",
+    raw_data_mode=DEFAULT_RAW_DATA_MODE,
+    similarity_top_k=DEFAULT_SIMILARITY_TOP_K,
+    similarity_windows=None,
+    window_hours=DEFAULT_WINDOW_HOURS,
+    bucket_minutes=DEFAULT_BUCKET_MINUTES,
+):
+
+    # raw_data, 키워드, 증분 집계에서 모두 읽으므로 S3를 한 번만 읽도록 persist
+    df = materialize(spark, df, "extract")
+
+    (
+        raw_df,
+        view_raw_data_df,
+        current_issue_df,
+        frequency_df,
+        issue_rollup_df,
+        keyword_dictionary_df,
+    ) = get_current_issue_and_raw_data(
+        spark,
+        df,
+        timestamp,
+        issue_mode,
+        grid_mode,
+        raw_data_mode,
+        window_hours,
+        bucket_minutes,
+    )
 
-    raw_df, view_raw_data_df, current_issue_df, frequency_df = (
-        get_current_issue_and_raw_data(spark, df, timestamp)
+    # load와 alert_alarm에서 모두 쓰이므로 DTW를 한 번만 계산하도록 persist
+    similar_df = materialize(
+        spark,
+        get_similarity(
+            spark,
+            current_issue_df,
+            keyword_dictionary_df,
+            timestamp,
+            similarity_top_k,
+            similarity_windows,
+            window_hours,
+            bucket_minutes,
+        ),
+        "similarity",
     )
 
-    similar_df = get_similarity(spark, current_issue_df)
+    # current_issue, issue_graph 테이블에는 키워드 문자열로 저장
+    current_issue_df = decode_keywords(current_issue_df, keyword_dictionary_df)
+
+    # 대시보드가 정렬 서브쿼리를 매번 다시 실행하지 않도록 미리 정렬한 테이블로 저장
+    window_start, window_end = get_analysis_window(timestamp, window_hours)
+    issue_graph_df = make_issue_graph_df(
+        spark, current_issue_df, window_start, window_end
+    )
 
-    return raw_df, view_raw_data_df, current_issue_df, frequency_df, similar_df
+    return (
+        raw_df,
+        view_raw_data_df,
+        current_issue_df,
+        frequency_df,
+        similar_df,
+        issue_rollup_df,
+        issue_graph_df,
+    )
 
 
-def load(raw_data_df, view_raw_data_df, current_issue_df, frequency_df, similar_df):
-    load_to_redshift(raw_data_df, "raw_data_df")
-    load_to_redshift(view_raw_data_df, "view_raw_data_df")
+def load(
+    raw_data_df,
+    view_raw_data_df,
+    current_issue_df,
+    frequency_df,
+    similar_df,
+    issue_rollup_df,
+    issue_graph_df,
+    timestamp,
+    issue_mode="full",
+    load_mode=DEFAULT_LOAD_MODE,
+    load_workers=DEFAULT_LOAD_WORKERS,
+    raw_data_mode=DEFAULT_RAW_DATA_MODE,
+    window_hours=DEFAULT_WINDOW_HOURS,
+):
+    # 짧은 기간 실행은 issue_rollup_df에 새 시간대만 있으므로 증분 모드처럼 추가
+    if window_hours > 0:
+        issue_mode = "incremental"
+
+    if load_mode in ("staged", "swap"):
+        load_staged(
+            {
+                "raw_data_df": raw_data_df,
+                "view_raw_data_df": view_raw_data_df,
+                "issue_rollup_df": issue_rollup_df,
+                "current_issue_df": current_issue_df,
+                "frequency_df": frequency_df,
+                "similar_df": similar_df,
+                "issue_graph_df": issue_graph_df,
+            },
+            timestamp,
+            issue_mode,
+            load_workers,
+            swap=load_mode == "swap",
+            raw_data_mode=raw_data_mode,
+        )
+        release("extract", "current_issue")
+        return
+
+    load_to_redshift(
+        raw_data_df, "raw_data_df", mode="merge" if raw_data_mode == "merge" else None
+    )
+    load_to_redshift(
+        view_raw_data_df,
+        "view_raw_data_df",
+        mode="merge" if raw_data_mode == "merge" else "append",
+    )
+
+    if issue_mode == "incremental":
+        # 새 시간대의 집계만 추가
+        load_to_redshift(
+            issue_rollup_df,
+            "issue_rollup_df",
+            mode="append",
+            preactions=make_issue_rollup_preactions(timestamp),
+        )
+    else:
+        load_to_redshift(issue_rollup_df, "issue_rollup_df", mode="overwrite")
 
     delete_issue_graph_view_and_keyword_frequency_view()
     load_to_redshift(current_issue_df, "current_issue_df")
     load_to_redshift(frequency_df, "frequency_df")
+    load_to_redshift(issue_graph_df, "issue_graph_df")
     create_issue_graph_view_and_keyword_frequency_view()
 
     load_to_redshift(similar_df, "similar_df")
 
-
+    # 빈도, 유사도는 alert_alarm에서 다시 쓰므로 나머지만 해제
+    release("extract", "current_issue")
+
+
+@instrument()
+def load_staged(
+    dfs,
+    timestamp,
+    issue_mode="full",
+    workers=DEFAULT_LOAD_WORKERS,
+    swap=False,
+    raw_data_mode=DEFAULT_RAW_DATA_MODE,
+):
+    # 1. 모든 테이블을 S3에 동시에 스테이징 (Redshift는 아직 변경되지 않음)
+    run_id = timestamp.replace(" ", "T").replace(":", "-")
+    staged = stage_all(dfs, run_id, workers)
+
+    if swap:
+        # 2-1. 대시보드 테이블은 스테이징 테이블에 먼저 COPY (대시보드가 읽는 테이블은 그대로)
+        sqls = []
+        for data in DASHBOARD_DATA:
+            table = REDSHIFT_TABLES[data]
+            sqls += [
+                f"DROP TABLE IF EXISTS {table}_staging",
+                f"CREATE TABLE {table}_staging (LIKE {table})",
+                make_copy_sql(data, *staged[data], table=f"{table}_staging"),
+            ]
+        print(f"copy {len(DASHBOARD_DATA)} dashboard tables to staging tables")
+        execute_transaction(sqls)
+
+    # 2. 하나의 트랜잭션에서 COPY, 실패하면 모든 테이블이 이전 상태로 남음
+    # TRUNCATE는 트랜잭션을 커밋하므로 덮어쓰기는 DELETE로 처리
+    # 뷰를 지우지 않으므로 대시보드는 커밋 전까지 이전 데이터를 읽음
+    sqls = []
+    for data, staging_table in RAW_DATA_STAGING_TABLES.items():
+        if raw_data_mode == "merge":
+            table = REDSHIFT_TABLES[data]
+            path, columns = staged[data]
+            sqls += [
+                f"CREATE TEMP TABLE {staging_table} (LIKE {table})",
+                make_copy_sql(data, path, columns, table=staging_table),
+                *make_staging_merge_sqls(data, columns),
+                f"DROP TABLE {staging_table}",
+            ]
+        else:
+            sqls.append(make_copy_sql(data, *staged[data]))
+
+    if issue_mode == "incremental":
+        sqls += make_issue_rollup_preactions(timestamp).split(";")
+    else:
+        sqls.append("DELETE FROM issue_rollup")
+    sqls.append(make_copy_sql("issue_rollup_df", *staged["issue_rollup_df"]))
+
+    for data in DASHBOARD_DATA:
+        table = REDSHIFT_TABLES[data]
+        if swap:
+            # 이름만 바꾸므로 테이블을 다시 쓰지 않음, 뷰는 아래에서 새 테이블로 다시 연결
+            sqls += [
+                f"ALTER TABLE {table} RENAME TO {table}_old",
+                f"ALTER TABLE {table}_staging RENAME TO {table}",
+            ]
+        else:
+            sqls += [f"DELETE FROM {table}", make_copy_sql(data, *staged[data])]
+
+    sqls += [
+        f"CREATE OR REPLACE VIEW issue_graph_view AS {ISSUE_GRAPH_VIEW_QUERY}",
+        f"CREATE OR REPLACE VIEW keyword_frequency_view AS {KEYWORD_FREQUENCY_VIEW_QUERY}",
+    ]
+
+    if swap:
+        # 뷰가 새 테이블을 가리킨 뒤에 이전 테이블 삭제
+        sqls += [f"DROP TABLE {REDSHIFT_TABLES[data]}_old" for data in DASHBOARD_DATA]
+
+    sqls = [sql.strip() for sql in sqls if sql.strip()]
+    print(f"copy {len(staged)} staged tables in one transaction ({len(sqls)} statements)")
+    execute_transaction(sqls)
+
+
+@instrument()
 def alert_alarm(frequency_df, similar_df):
 
+    if "window_hours" in similar_df.columns:
+        # top-k 결과는 가장 긴 기간에서 가장 유사한 과거 이슈로 알림
+        max_window = similar_df.agg(F.max("window_hours")).first()[0]
+        similar_df = similar_df.filter(
+            (col("window_hours") == max_window) & (col("similarity_rank") == 1)
+        )
+
     alarm_df = frequency_df.join(similar_df, on="current_keyword", how="left")
 
     alarm_df = alarm_df.withColumn(
@@ -638,20 +2152,163 @@ def alert_alarm(frequency_df, similar_df):
         "NewStateReason": "{아이오닉6 누수}",
     }
 
-    client = boto3.client("sns", region_name="ap-northeast-2")
-    response = client.publish(
-        TargetArn="<ARN>",
-        Message=json.dumps(message),
-    )
+    publish_alarm(message)
 
 
 if __name__ == "__main__":
     spark = SparkSession.builder.appName("emr").getOrCreate()
-    df, timestamp = extract(spark)
-    raw_df, view_raw_data_df, current_issue_df, frequency_df, similar_df = transform(
-        spark, df, timestamp
-    )
-    print("transform finish")
 
-    load(raw_df, view_raw_data_df, current_issue_df, frequency_df, similar_df)
-    alert_alarm(frequency_df, similar_df)
+    # aws: S3, Redshift, SNS 사용, local: --local_root 아래 파일로 대신 (local_io.py)
+    IO_BACKEND["backend"] = get_job_arg("--io_backend", IO_BACKEND["backend"])
+    IO_BACKEND["root"] = get_job_arg("--local_root", IO_BACKEND["root"])
+    if is_local() and not IO_BACKEND["root"]:
+        raise ValueError("--local_root is required with --io_backend local")
+    print(f"io_backend: {IO_BACKEND}")
+
+    # 단계별 수행 시간, Spark 지표를 기록해 s3://monitordog-data/run_reports/{recent_time}/에 저장
+    METRICS["enabled"] = get_job_arg("--metrics", "false") == "true"
+    METRICS["row_counts"] = get_job_arg("--metrics_row_counts", "false") == "true"
+    print(f"metrics: {METRICS}")
+
+    # full: raw_data 전체 재집계 (issue_rollup 테이블 재생성), incremental: 새 파일만 집계 후 병합
+    issue_mode = get_job_arg("--issue_mode", "full")
+    print(f"issue_mode: {issue_mode}")
+
+    # dense: 분석 기간의 모든 (시간, 키워드) 셀 저장, sparse: 값이 있는 셀만 저장
+    grid_mode = get_job_arg("--grid_mode", "dense")
+    print(f"grid_mode: {grid_mode}")
+
+    # 중간 결과 재사용 설정, --persist_stages none 이면 persist 하지 않음
+    persist_stages = get_job_arg("--persist_stages", None)
+    if persist_stages is not None:
+        MATERIALIZATION["stages"] = set(persist_stages.split(",")) - {"none"}
+    MATERIALIZATION["storage_level"] = get_job_arg(
+        "--storage_level", MATERIALIZATION["storage_level"]
+    )
+    MATERIALIZATION["track"] = get_job_arg("--track_computations", "false") == "true"
+    print(f"materialization: {MATERIALIZATION}")
+
+    # connector: 테이블마다 순서대로 적재, staged: S3에 동시에 스테이징 후 한 트랜잭션으로 COPY
+    # swap: staged + 대시보드 테이블은 스테이징 테이블로 교체
+    load_mode = get_job_arg("--load_mode", DEFAULT_LOAD_MODE)
+    load_workers = int(get_job_arg("--load_workers", DEFAULT_LOAD_WORKERS))
+    print(f"load_mode: {load_mode} (workers: {load_workers})")
+    if is_local() and load_mode != "connector":
+        # staged, swap은 Redshift COPY와 트랜잭션이 필요하므로 로컬에서는 테이블마다 적재
+        raise ValueError(f"Cannot use load_mode '{load_mode}' with --io_backend local")
+
+    # append: raw_data에 그대로 추가, merge: url 기준으로 병합해 게시글당 한 행만 유지
+    raw_data_mode = get_job_arg("--raw_data_mode", DEFAULT_RAW_DATA_MODE)
+    print(f"raw_data_mode: {raw_data_mode}")
+    if raw_data_mode == "merge" and issue_mode == "incremental":
+        # 다시 수집된 게시글의 이전 값이 issue_rollup에 남아 두 번 집계되므로 full 모드만 허용
+        raise ValueError("Cannot use --raw_data_mode merge with --issue_mode incremental")
+
+    # raw_data 보관 기간(일), 0이면 정리하지 않음
+    retention_days = int(get_job_arg("--retention_days", DEFAULT_RETENTION_DAYS))
+    print(f"retention_days: {retention_days}")
+
+    # 키워드마다 저장할 유사한 과거 이슈 수, 0이면 전체
+    similarity_top_k = int(get_job_arg("--similarity_top_k", DEFAULT_SIMILARITY_TOP_K))
+    print(f"similarity_top_k: {similarity_top_k}")
+
+    # top-k 검색에서 비교할 최근 기간(시간 수), 예: 24,168,1488
+    similarity_windows = [
+        int(window)
+        for window in get_job_arg(
+            "--similarity_windows", DEFAULT_SIMILARITY_WINDOWS
+        ).split(",")
+        if window
+    ] or None
+    print(f"similarity_windows: {similarity_windows}")
+
+    # 분석 기간(시간 수, 0이면 ANALYSIS_WINDOW_DAYS일)과 시간 그리드 간격(분)
+    # 예: --window_hours 48 --bucket_minutes 15 (매 실행 알림용), 기본값 (62일, 1시간)
+    window_hours = int(get_job_arg("--window_hours", DEFAULT_WINDOW_HOURS))
+    bucket_minutes = int(get_job_arg("--bucket_minutes", DEFAULT_BUCKET_MINUTES))
+    if bucket_minutes <= 0 or 60 % bucket_minutes != 0:
+        raise ValueError(f"bucket_minutes ({bucket_minutes}) must divide 60")
+    print(f"window_hours: {window_hours}, bucket_minutes: {bucket_minutes}")
+    if window_hours > 0 and raw_data_mode != "merge":
+        # 긴 기간 실행과 같은 시간대의 게시글을 raw_data, raw_data_view에 한 번 더 적재하므로
+        # url 기준으로 병합해야 중복으로 쌓이지 않음
+        raise ValueError("--window_hours requires --raw_data_mode merge")
+
+    # 키워드 쏠림 처리: 키워드 단위 합계를 salt로 나눠 2단계 집계, AQE 설정
+    SKEW["salt_buckets"] = int(get_job_arg("--skew_salt_buckets", SKEW["salt_buckets"]))
+    print(f"skew: {SKEW}")
+    for name, conf in AQE_CONF_ARGS.items():
+        value = get_job_arg(name)
+        if value is not None:
+            spark.conf.set(conf, value)
+        print(f"{conf}: {spark.conf.get(conf)}")
+
+    run_start = time.perf_counter()
+    recent_time = get_job_arg("--recent_time")
+    timestamp = None
+    status = "failed"
+    try:
+        df, timestamp = extract(spark)
+        (
+            raw_df,
+            view_raw_data_df,
+            current_issue_df,
+            frequency_df,
+            similar_df,
+            issue_rollup_df,
+            issue_graph_df,
+        ) = transform(
+            spark,
+            df,
+            timestamp,
+            issue_mode,
+            grid_mode,
+            raw_data_mode,
+            similarity_top_k,
+            similarity_windows,
+            window_hours,
+            bucket_minutes,
+        )
+        print("transform finish")
+
+        load(
+            raw_df,
+            view_raw_data_df,
+            current_issue_df,
+            frequency_df,
+            similar_df,
+            issue_rollup_df,
+            issue_graph_df,
+            timestamp,
+            issue_mode,
+            load_mode,
+            load_workers,
+            raw_data_mode,
+            window_hours,
+        )
+        alert_alarm(frequency_df, similar_df)
+        release("frequency", "similarity")
+
+        if (
+            retention_days > 0
+            and datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").hour
+            == RAW_DATA_MAINTENANCE_HOUR
+        ):
+            maintain_raw_data(timestamp, retention_days)
+
+        status = "succeeded"
+    finally:
+        if METRICS["enabled"]:
+            # 리포트 저장이 실패해도 job의 성공/실패나 원래 예외가 바뀌지 않도록 로그만 남김
+            try:
+                save_run_report(
+                    make_run_report(
+                        spark, recent_time, timestamp, status, time.perf_counter() - run_start
+                    ),
+                    recent_time,
+                )
+            except Exception as e:
+                print(f"failed to save run report: {e!r}")
+
+    if MATERIALIZATION["track"]:
+        print(f"stage computations: {json.dumps(get_stage_computations())}")
@@ -1,10 +1,24 @@
 import boto3
 import json
+import os
 
 
 def lambda_handler(event, context):
     BUCKET_NAME = "monitordog-data"
-    DIRECTORY_PATH = "keywords/"
+    # keywords/ 단계 입력 형식: jsonl, parquet
+    INPUT_FORMAT = os.environ.get("INPUT_FORMAT", "jsonl")
+    LOAD_MODE = os.environ.get("LOAD_MODE", "connector")
+    # true면 단계별 수행 시간, Spark 지표를 s3://monitordog-data/run_reports/에 저장
+    METRICS = os.environ.get("METRICS", "false")
+    # 분석 기간(시간 수, 0이면 62일)과 시간 그리드 간격(분), 예: 알림용 48, 15
+    WINDOW_HOURS = os.environ.get("WINDOW_HOURS", "0")
+    BUCKET_MINUTES = os.environ.get("BUCKET_MINUTES", "60")
+    # raw_data 적재 방식, 짧은 기간 실행은 같은 게시글을 다시 적재하므로 merge만 가능
+    RAW_DATA_MODE = os.environ.get("RAW_DATA_MODE", "merge" if WINDOW_HOURS != "0" else "append")
+    # 키워드마다 저장할 유사한 과거 이슈 수(0이면 전체)와 비교할 최근 기간(시간 수), 예: 1, 24,168,1488
+    SIMILARITY_TOP_K = os.environ.get("SIMILARITY_TOP_K", "0")
+    SIMILARITY_WINDOWS = os.environ.get("SIMILARITY_WINDOWS", "")
+    DIRECTORY_PATH = "keywords_parquet/" if INPUT_FORMAT == "parquet" else "keywords/"
     required_file_count = 4
     
     s3_client = boto3.client('s3', region_name='ap-northeast-2')
@@ -17,7 +31,10 @@ def lambda_handler(event, context):
     recent_time = recent_file.split("_")[-1].split(".")[0]
     print("recent_time", recent_time)
 
-    DEEP_DIRECTORY_PATH = f"keywords/{recent_time}"
+    if INPUT_FORMAT == "parquet":
+        DEEP_DIRECTORY_PATH = f"keywords_parquet/crawl_hour={recent_time}/"
+    else:
+        DEEP_DIRECTORY_PATH = f"keywords/{recent_time}"
     s3_objects = s3_client.list_objects(Bucket=BUCKET_NAME, Prefix=DEEP_DIRECTORY_PATH)
     
     print(s3_objects)
@@ -33,9 +50,21 @@ def lambda_handler(event, context):
         step_args = [
             'spark-submit', 
             '--deploy-mode', 'cluster',
+            '--py-files', 's3://ex-emr/scripts/issue_score.py,s3://ex-emr/scripts/post_schema.py',  # DTW/이슈화 점수 계산, 게시글 스키마 모듈
             's3://ex-emr/scripts/emr.py',
-            '--recent_time', recent_time  # recent_time 값을 매개변수로 추가
+            '--recent_time', recent_time,  # recent_time 값을 매개변수로 추가
+            '--num_files', str(required_file_count),
+            '--input_format', INPUT_FORMAT,
+            '--load_mode', LOAD_MODE,
+            '--metrics', METRICS,
+            '--window_hours', WINDOW_HOURS,
+            '--bucket_minutes', BUCKET_MINUTES,
+            '--raw_data_mode', RAW_DATA_MODE,
+            '--similarity_top_k', SIMILARITY_TOP_K
         ]
+        if SIMILARITY_WINDOWS:
+            # 빈 값은 인자로 넘어가지 않으므로 기간이 있을 때만 추가
+            step_args += ['--similarity_windows', SIMILARITY_WINDOWS]
         
         step = {
             'Name': 'Process new data and load to Redshift',
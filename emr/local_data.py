@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+    로컬 실행(--io_backend local)용 합성 데이터 생성
+
+    --local_root 아래에 emr.py가 읽는 입력을 만듭니다.
+    - keywords/{recent_time}/{data_source}_{model}_{recent_time}.jsonl: 이번 실행에 들어온 게시글 (post_schema로 검증)
+    - keywords_parquet/crawl_hour={recent_time}/...: --parquet를 주면 같은 게시글을 Parquet으로도 저장
+    - raw_data 테이블: recent_time 이전 --history_days일 동안 시간마다 --posts_per_hour개의 게시글
+    - past_issue 테이블: --num_past_issues개의 과거 이슈 (시간별 이슈화, 감정)
+
+    키워드는 소수의 키워드가 대부분의 게시글에 나오도록 Zipf 분포로 뽑고,
+    --burst_keyword는 recent_time 직전 --burst_hours시간 동안 게시글과 반응이 몰리도록 만듭니다.
+    --variant_rate 비율의 키워드는 띄어쓰기, 대소문자가 다른 변형('아이오닉 6', 'G80')으로 씁니다.
+
+    사용법:
+        spark-submit --master "local[*]" --py-files transform/issue_score.py,transform/post_schema.py,emr/local_io.py \\
+            emr/local_data.py --local_root /tmp/monitordog --recent_time 2024-08-10T14-00-00
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import col
+from pyspark.sql.types import (
+    DoubleType,
+    StringType,
+    StructField,
+    StructType,
+    TimestampType,
+)
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "transform"))
+from post_schema import to_arrow_table, validate_post
+
+import local_io
+from emr import (
+    ANALYSIS_WINDOW_DAYS,
+    BUCKET_NAME,
+    DEFAULT_NUM_FILES,
+    DIRECTORY_PATH,
+    KEYWORD_POST_SCHEMA,
+    PARQUET_DIRECTORY_PATH,
+    make_raw_df,
+)
+
+
+DATA_SOURCES = ["dc", "naver", "bobae", "clien"]
+MODELS = ["아이오닉6", "코나", "g80", "그랜저"]
+WORDS = ["누수", "급발진", "리콜", "배터리", "충전", "소음", "연비", "가격", "옵션", "출고"]
+
+PAST_ISSUE_SCHEMA = StructType(
+    [
+        StructField("past_issue_name", StringType()),
+        StructField("created_at", TimestampType()),
+        StructField("past_issueization", DoubleType()),
+        StructField("past_sentiment", DoubleType()),
+    ]
+)
+
+# 같은 키워드의 표기 변형 (emr.py에서 normalize_keywords로 합쳐짐)
+KEYWORD_VARIANTS = {
+    "아이오닉6": ["아이오닉 6", " 아이오닉6"],
+    "g80": ["G80", "G 80"],
+    "그랜저": ["그랜 저"],
+}
+
+# raw_data 생성 시 게시글에 붙일 시간 컬럼
+HISTORY_SCHEMA = StructType(
+    KEYWORD_POST_SCHEMA.fields + [StructField("file_create_time", StringType())]
+)
+
+
+def pick_keywords(rng, vocabulary, weights, burst_keyword=None, variant_rate=0.0):
+    keywords = list(rng.choice(vocabulary, size=rng.integers(1, 6), replace=False, p=weights))
+    if burst_keyword and burst_keyword not in keywords:
+        keywords.append(burst_keyword)
+
+    keywords = [str(keyword) for keyword in keywords]
+    if variant_rate > 0:
+        keywords = [
+            str(rng.choice(KEYWORD_VARIANTS[keyword]))
+            if keyword in KEYWORD_VARIANTS and rng.random() < variant_rate
+            else keyword
+            for keyword in keywords
+        ]
+
+    return keywords
+
+
+def make_post(rng, data_source, model, index, created_at, keywords, scale=1.0):
+    comments = [
+        {
+            "author": f"user{i}",
+            "content": " ".join(rng.choice(WORDS, size=rng.integers(3, 30))),
+            "created_at": created_at,
+            "num_of_comments": 0,
+            "children": [],
+        }
+        for i in range(rng.integers(0, 10))
+    ]
+
+    post = {
+        "title": " ".join(rng.choice(WORDS, size=5)),
+        "content": " ".join(rng.choice(WORDS, size=rng.integers(50, 300))),
+        "author": f"author{index}",
+        "created_at": created_at,
+        "viewed": int(rng.poisson(200 * scale)),
+        "liked": int(rng.poisson(3 * scale)),
+        "num_of_comments": len(comments),
+        "comments": comments,
+        "model": model,
+        "data_source": data_source,
+        "url": f"https://{data_source}.example.com/{model}/{index}",
+        "sentiment": float(rng.uniform(-1, 1)),
+        "keywords": keywords,
+    }
+    validate_post(post, "keywords")
+
+    return post
+
+
+def make_vocabulary(num_keywords, zipf_a):
+    # 차종, 자주 나오는 단어 뒤에 드물게 나오는 키워드를 붙여 num_keywords개
+    vocabulary = MODELS + WORDS
+    vocabulary += [f"키워드{i}" for i in range(max(num_keywords - len(vocabulary), 0))]
+    vocabulary = vocabulary[:num_keywords]
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1) ** zipf_a
+
+    return vocabulary, weights / weights.sum()
+
+
+def make_hour_posts(seed, hour, start_index, posts_per_hour, recent_time, args):
+    """
+    한 시간 동안 네 커뮤니티 x 차종 파일에 들어온 게시글
+    burst_keyword는 recent_time 직전 burst_hours시간 동안 등장 빈도와 반응이 커짐
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary, weights = make_vocabulary(args.num_keywords, args.zipf_a)
+    bursting = (recent_time - hour) < timedelta(hours=args.burst_hours)
+
+    posts = []
+    for i in range(posts_per_hour):
+        # 한 시간에 DEFAULT_NUM_FILES개 파일 (커뮤니티 x 차종)이 들어옴
+        data_source = DATA_SOURCES[i % DEFAULT_NUM_FILES % len(DATA_SOURCES)]
+        model = MODELS[i % DEFAULT_NUM_FILES % len(MODELS)]
+        created_at = hour - timedelta(minutes=int(rng.integers(0, 60)))
+        created_at = created_at.strftime("%Y-%m-%d %H:%M:%S")
+        burst = args.burst_keyword if bursting and rng.random() < 0.5 else None
+        posts.append(
+            make_post(
+                rng,
+                data_source,
+                model,
+                start_index + i,
+                created_at,
+                pick_keywords(rng, vocabulary, weights, burst, args.variant_rate),
+                scale=10.0 if burst else 1.0,
+            )
+        )
+
+    return posts
+
+
+def write_keyword_files(root, recent_time_str, posts, parquet=False):
+    """
+    emr.py의 extract가 읽는 keywords/{recent_time} 파일 (커뮤니티 x 차종)
+    """
+    files = {}
+    for post in posts:
+        files.setdefault((post["data_source"], post["model"]), []).append(post)
+
+    for (data_source, model), file_posts in files.items():
+        file_name = f"{data_source}_{model}_{recent_time_str}"
+
+        key = f"{DIRECTORY_PATH}/{recent_time_str}/{file_name}.jsonl"
+        body = "".join(json.dumps(post, ensure_ascii=False) + "\n" for post in file_posts)
+        local_io.write_object(root, BUCKET_NAME, key, body.encode("utf-8"))
+
+        if parquet:
+            import pyarrow.parquet as pq
+
+            parquet_dir = local_io.get_object_path(
+                root,
+                BUCKET_NAME,
+                f"{PARQUET_DIRECTORY_PATH}/crawl_hour={recent_time_str}/data_source={data_source}/model={model}",
+            )
+            os.makedirs(parquet_dir, exist_ok=True)
+            pq.write_table(
+                to_arrow_table(file_posts, "keywords", exclude=("data_source", "model")),
+                os.path.join(parquet_dir, f"{file_name}.parquet"),
+            )
+
+
+def to_history_row(post, file_create_time):
+    # KEYWORD_POST_SCHEMA에서 count, json 필드는 문자열
+    row = dict(post)
+    for name in ["viewed", "liked", "num_of_comments"]:
+        row[name] = str(row[name])
+    row["comments"] = json.dumps(row["comments"], ensure_ascii=False)
+    row["file_create_time"] = file_create_time
+
+    return row
+
+
+def write_raw_data(spark, root, recent_time, args):
+    """
+    recent_time 이전 history_days일 동안의 raw_data (emr.py가 적재하는 것과 같은 컬럼과 타입)
+    시간마다 executor에서 게시글을 만들고 make_raw_df로 변환
+    """
+    num_hours = args.history_days * 24
+    hours = [recent_time - timedelta(hours=h) for h in range(num_hours, 0, -1)]
+
+    def make_rows(hour_index):
+        hour = hours[hour_index]
+        posts = make_hour_posts(
+            args.seed + hour_index + 1,
+            hour,
+            hour_index * args.posts_per_hour,
+            args.posts_per_hour,
+            recent_time,
+            args,
+        )
+        file_create_time = hour.strftime("%Y-%m-%d %H:%M:%S")
+        return [to_history_row(post, file_create_time) for post in posts]
+
+    rdd = spark.sparkContext.parallelize(range(num_hours), max(num_hours // 24, 1))
+    history_df = spark.createDataFrame(rdd.flatMap(make_rows), HISTORY_SCHEMA)
+
+    # file_create_time은 make_raw_df에서 lit(timestamp) 대신 시간별 값 사용
+    raw_data_df = make_raw_df(history_df, col("file_create_time"))
+
+    local_io.write_table(raw_data_df, root, "raw_data", "overwrite")
+
+    return num_hours * args.posts_per_hour
+
+
+def write_past_issue(spark, root, args):
+    """
+    과거 이슈마다 한 번 크게 오르는 시간별 이슈화 (길이와 시작 시간은 이슈마다 다름)
+    """
+    rng = np.random.default_rng(args.seed)
+    rows = []
+    for i in range(args.num_past_issues):
+        length = int(rng.integers(24 * 7, 24 * 62))
+        start = datetime(2023, 1, 1) + timedelta(hours=int(rng.integers(0, 24 * 300)))
+        peak = rng.integers(0, length)
+        width = rng.uniform(12, 24 * 7)
+        t = np.arange(length)
+        issueization = np.exp(-0.5 * ((t - peak) / width) ** 2) * rng.uniform(5, 20)
+        active = rng.random(length) < 0.3 + 0.7 * (issueization > 1)
+
+        for h in range(length):
+            rows.append(
+                (
+                    f"과거이슈{i}",
+                    start + timedelta(hours=h),
+                    float(issueization[h] if active[h] else 0.0),
+                    float(rng.uniform(-1, 1)),
+                )
+            )
+
+    past_issue_df = spark.createDataFrame(rows, PAST_ISSUE_SCHEMA)
+    local_io.write_table(past_issue_df, root, "past_issue", "overwrite")
+
+    return len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--local_root", required=True)
+    parser.add_argument("--recent_time", required=True, help="예: 2024-08-10T14-00-00")
+    parser.add_argument("--posts_per_file", type=int, default=500)
+    parser.add_argument("--history_days", type=int, default=ANALYSIS_WINDOW_DAYS)
+    parser.add_argument("--posts_per_hour", type=int, default=50)
+    parser.add_argument("--num_keywords", type=int, default=200)
+    parser.add_argument("--zipf_a", type=float, default=1.1)
+    parser.add_argument("--num_past_issues", type=int, default=10)
+    parser.add_argument("--burst_keyword", default="누수")
+    parser.add_argument("--burst_hours", type=int, default=6)
+    parser.add_argument("--variant_rate", type=float, default=0.0)
+    parser.add_argument("--parquet", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    recent_time = datetime.strptime(args.recent_time, "%Y-%m-%dT%H-%M-%S")
+
+    spark = SparkSession.builder.appName("local_data").getOrCreate()
+
+    posts = make_hour_posts(
+        args.seed,
+        recent_time,
+        10**9,
+        args.posts_per_file * DEFAULT_NUM_FILES,
+        recent_time,
+        args,
+    )
+    write_keyword_files(args.local_root, args.recent_time, posts, args.parquet)
+    print(f"keywords: {len(posts)} posts")
+
+    print(f"raw_data: {write_raw_data(spark, args.local_root, recent_time, args)} rows")
+    print(f"past_issue: {write_past_issue(spark, args.local_root, args)} rows")
+
+    spark.stop()
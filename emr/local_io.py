@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+    로컬 실행용 I/O (emr.py --io_backend local --local_root PATH)
+
+    EMR 없이 한 대의 머신에서 local[*] Spark로 extract -> transform -> load -> alert 전체를 실행하고
+    수행 시간을 재기 위해 AWS 서비스를 로컬 파일로 대신합니다.
+    - S3: {root}/{bucket}/{key} 파일
+    - Redshift 테이블: {root}/redshift/{table}/{version}/ Parquet 디렉터리 (덮어쓸 때마다 새 버전)
+    - Redshift 뷰: 같은 SQL로 만든 Spark 임시 뷰
+    - SNS: SENT_MESSAGES 리스트와 {root}/sns/messages.jsonl
+
+    emr.py와 함께 --py-files로 전달하며, emr.py에서 local 백엔드를 쓸 때만 import 합니다.
+"""
+
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+
+from pyspark.sql import SparkSession, Window
+import pyspark.sql.functions as F
+from pyspark.sql.functions import col, expr
+
+
+REDSHIFT_DIRECTORY = "redshift"
+SNS_DIRECTORY = "sns"
+# 테이블마다 남겨둘 버전 수 (덮어쓰기마다 새 버전을 만듦)
+KEEP_TABLE_VERSIONS = 3
+
+# 로컬에서 실행할 수 있는 SQL (적재 전후에 실행하는 DELETE, 대시보드 뷰)
+DELETE_PATTERN = re.compile(r"^DELETE\s+FROM\s+(\w+)(?:\s+WHERE\s+(.+))?$", re.I | re.S)
+DROP_VIEW_PATTERN = re.compile(r"^DROP\s+VIEW\s+IF\s+EXISTS\s+(\w+)$", re.I)
+CREATE_VIEW_PATTERN = re.compile(
+    r"^CREATE\s+(?:OR\s+REPLACE\s+)?VIEW\s+(\w+)\s+AS\s+(.+)$", re.I | re.S
+)
+
+# alert_alarm이 보낸 메시지 (같은 프로세스에서 확인할 때 사용)
+SENT_MESSAGES = []
+
+
+"""
+    -- S3를 대신하는 함수 --
+
+    get_object_path(root, bucket, key)
+    list_objects(root, bucket, prefix)
+        - boto3 list_objects의 Contents와 같은 형태 ({"Key", "LastModified", "Size"})
+    read_object(root, bucket, key)
+        - 파일이 없으면 None
+    write_object(root, bucket, key, body)
+"""
+
+
+def get_object_path(root, bucket, key=""):
+    return os.path.join(root, bucket, key)
+
+
+def list_objects(root, bucket, prefix):
+    bucket_path = get_object_path(root, bucket)
+
+    objects = []
+    for dir_path, _, file_names in os.walk(bucket_path):
+        for file_name in file_names:
+            path = os.path.join(dir_path, file_name)
+            key = os.path.relpath(path, bucket_path).replace(os.sep, "/")
+            if key.startswith(prefix):
+                stat = os.stat(path)
+                objects.append(
+                    {
+                        "Key": key,
+                        "LastModified": datetime.fromtimestamp(stat.st_mtime),
+                        "Size": stat.st_size,
+                    }
+                )
+
+    return objects
+
+
+def read_object(root, bucket, key):
+    path = get_object_path(root, bucket, key)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def write_object(root, bucket, key, body):
+    path = get_object_path(root, bucket, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "wb") as f:
+        f.write(body)
+
+
+"""
+    -- Redshift를 대신하는 함수 --
+
+    get_table_versions(root, table)
+    get_table_path(root, table, version=None)
+        - 버전을 주지 않으면 최신 버전 경로
+    read_table(spark, root, table, columns=None, predicate=None)
+        - 커넥터의 query 옵션처럼 필요한 컬럼과 조건만 읽기
+    write_table(df, root, table, mode="overwrite", preactions=None)
+        - preactions(DELETE)를 실행한 뒤 append 또는 overwrite
+    merge_table(df, root, table, key="url", order_column="file_create_time")
+        - make_raw_data_merge_sqls, make_raw_data_view_merge_sqls와 같이 key별로 order_column이 가장 최신인 행만 유지
+    execute(spark, root, sql)
+        - DELETE, DROP VIEW, CREATE VIEW만 지원
+    archive_rows(spark, root, table, condition, path, partition_column)
+        - 조건에 맞는 행을 partition_column별 Parquet으로 복사
+    get_table_fingerprint(spark, root, table)
+        - 테이블이 바뀌었는지 확인하기 위한 요약 값
+"""
+
+
+def get_table_versions(root, table):
+    table_path = os.path.join(root, REDSHIFT_DIRECTORY, table)
+    if not os.path.isdir(table_path):
+        return []
+
+    return sorted(int(name) for name in os.listdir(table_path) if name.isdigit())
+
+
+def get_table_path(root, table, version=None):
+    if version is None:
+        versions = get_table_versions(root, table)
+        if not versions:
+            raise FileNotFoundError(f"Local table '{table}' does not exist in {root}")
+        version = versions[-1]
+
+    return os.path.join(root, REDSHIFT_DIRECTORY, table, str(version))
+
+
+def read_table(spark, root, table, columns=None, predicate=None):
+    df = spark.read.parquet(get_table_path(root, table))
+    if predicate:
+        df = df.filter(expr(predicate))
+    if columns:
+        df = df.select(*columns)
+
+    return df
+
+
+def _write_version(df, root, table):
+    # 덮어쓰기는 새 버전 디렉터리에 쓰고, 이전 버전은 바로 지우지 않음
+    # 지연 계산되는 DataFrame이 같은 실행 안에서 이전 버전 파일을 다시 읽을 수 있기 때문
+    versions = get_table_versions(root, table)
+    version = versions[-1] + 1 if versions else 1
+    path = get_table_path(root, table, version)
+
+    # 쓰다가 실패한 디렉터리가 최신 버전으로 읽히지 않도록 다 쓴 뒤 이름 변경
+    df.write.mode("overwrite").parquet(f"{path}.tmp")
+    os.rename(f"{path}.tmp", path)
+
+    for old_version in versions[:-KEEP_TABLE_VERSIONS]:
+        shutil.rmtree(get_table_path(root, table, old_version), ignore_errors=True)
+
+
+def write_table(df, root, table, mode="overwrite", preactions=None):
+    if preactions:
+        for sql in preactions.split(";"):
+            if sql.strip():
+                execute(df.sparkSession, root, sql)
+
+    if mode == "append" and get_table_versions(root, table):
+        df.write.mode("append").parquet(get_table_path(root, table))
+    else:
+        _write_version(df, root, table)
+
+
+def merge_table(df, root, table, key="url", order_column="file_create_time"):
+    if not get_table_versions(root, table):
+        _write_version(df, root, table)
+        return
+
+    # 같은 시간이면 새로 들어온 행을 남김 (MERGE의 WHEN MATCHED THEN UPDATE)
+    # 키워드마다 한 행인 raw_data_view처럼 key가 같은 행이 여러 개면 가장 최신 행들을 모두 남김
+    existing_df = read_table(df.sparkSession, root, table).withColumn("_new", F.lit(0))
+    window = Window.partitionBy(key).orderBy(col(order_column).desc(), col("_new").desc())
+
+    merged_df = (
+        existing_df.unionByName(df.withColumn("_new", F.lit(1)))
+        .withColumn("_rank", F.rank().over(window))
+        .filter(col("_rank") == 1)
+        .drop("_new", "_rank")
+    )
+
+    _write_version(merged_df, root, table)
+
+
+def execute(spark, root, sql):
+    sql = sql.strip().rstrip(";").strip()
+
+    match = DELETE_PATTERN.match(sql)
+    if match:
+        table, condition = match.groups()
+        if get_table_versions(root, table):
+            df = read_table(spark, root, table)
+            kept_df = df.filter(~expr(condition)) if condition else df.limit(0)
+            _write_version(kept_df, root, table)
+        return
+
+    match = DROP_VIEW_PATTERN.match(sql)
+    if match:
+        spark.catalog.dropTempView(match.group(1))
+        return
+
+    match = CREATE_VIEW_PATTERN.match(sql)
+    if match:
+        view, query = match.groups()
+        # 뷰가 읽는 테이블을 임시 뷰로 등록한 뒤 같은 SQL로 뷰 생성
+        for table in re.findall(r"\bfrom\s+(\w+)", query, re.I):
+            read_table(spark, root, table).createOrReplaceTempView(table)
+        spark.sql(query).createOrReplaceTempView(view)
+        return
+
+    raise ValueError(f"Cannot execute SQL on local backend: {sql[:80]}")
+
+
+def archive_rows(spark, root, table, condition, path, partition_column):
+    df = read_table(spark, root, table).filter(expr(condition))
+    df.withColumn(partition_column, F.to_date("file_create_time")).write.partitionBy(
+        partition_column
+    ).mode("errorifexists").parquet(path)
+
+
+def get_table_fingerprint(spark, root, table):
+    # PAST_ISSUE_FINGERPRINT_QUERY와 같은 요약 값 (해시 함수만 Spark의 hash 사용)
+    df = read_table(spark, root, table)
+    row = df.agg(
+        F.count("*"),
+        F.countDistinct("past_issue_name"),
+        F.min("created_at").cast("string"),
+        F.max("created_at").cast("string"),
+        F.sum("past_issueization"),
+        F.sum(F.hash("past_issue_name", "created_at", "past_issueization").cast("long")),
+    ).first()
+
+    return [[{"stringValue": str(value)} for value in row]]
+
+
+"""
+    -- SNS를 대신하는 함수 --
+
+    publish(root, message)
+"""
+
+
+def publish(root, message):
+    SENT_MESSAGES.append(message)
+
+    path = os.path.join(root, SNS_DIRECTORY, "messages.jsonl")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(message, ensure_ascii=False) + "\n")
+
+
+def get_spark():
+    return SparkSession.builder.getOrCreate()
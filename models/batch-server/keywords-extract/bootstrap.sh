@@ -26,12 +26,13 @@ sudo docker run \
 sudo docker exec bareun /bareun/bin/bareun -reg <API_KEY>
 
 sudo yum install -y python3 python3-pip
-sudo pip install numpy scikit-learn sentence-transformers bareunpy flask boto3
+sudo pip install numpy scikit-learn sentence-transformers bareunpy flask boto3 pyarrow
 
 sudo mkdir -p /opt/flask/logs
 
 aws s3 cp s3://monitordog-model/kpfSBERT.tar.gz ./kpfSBERT.tar.gz
 aws s3 cp s3://monitordog-model/keyword-extract.py /opt/flask/app.py
+aws s3 cp s3://monitordog-model/post_schema.py /opt/flask/post_schema.py
 
 tar -xvf kpfSBERT.tar.gz
 mv output/kpfSBERT /opt/flask/kpfSBERT
@@ -9,6 +9,7 @@ import os
 from flask import Flask, request, jsonify
 import logging
 from urllib import parse
+from post_schema import validate_post, to_arrow_table
 
 # 로깅 설정
 logging.basicConfig(
@@ -24,6 +25,12 @@ logger = logging.getLogger(__name__)
 
 
 API_KEY = os.environ["API_KEY"]
+
+# 결과 저장 형식: jsonl, parquet, both
+OUTPUT_FORMAT = os.environ.get("OUTPUT_FORMAT", "jsonl")
+
+# Parquet 파티션 컬럼 (파일 경로에 기록되므로 파일 안에는 저장하지 않음)
+PARTITION_COLUMNS = ("data_source", "model")
 tagger = Tagger(API_KEY, 'localhost', port=5757) # KPF에서 제공하는 바른 형태소 분석기
 
 model = SentenceTransformer('/opt/flask/kpfSBERT-back', device='cpu')
@@ -88,6 +95,7 @@ def batch_inference(bucket_name, file_name):
 
     logging.info("jsonl inference 시작")
     line_num = 1
+    records = []
     # JSONL 파일 읽기 및 추론
     with open(local_file_path, 'r') as infile, open('/tmp/modified_file.jsonl', 'w') as outfile:
         for line in infile:
@@ -100,8 +108,17 @@ def batch_inference(bucket_name, file_name):
             # 결과 추가
             record['keywords'] = keywords
 
+            # 스키마와 맞지 않는 레코드는 다음 단계로 넘기지 않음
+            try:
+                validate_post(record, 'keywords')
+            except ValueError as e:
+                logging.error(str(e))
+                continue
+
             # 수정된 행 저장
             outfile.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if OUTPUT_FORMAT != "jsonl":
+                records.append(record)
     logging.info("jsonl inference 종료")
 
 
@@ -110,13 +127,37 @@ def batch_inference(bucket_name, file_name):
         file_metadata = file_name.split("/")
         origin_file_name = file_metadata[-1]
         origin_file_path = file_metadata[-2]
-        # 수정된 파일을 S3에 업로드
-        s3.upload_file('/tmp/modified_file.jsonl', bucket_name, f"keywords/{origin_file_path}/{origin_file_name}")
+        if OUTPUT_FORMAT != "parquet":
+            # 수정된 파일을 S3에 업로드
+            s3.upload_file('/tmp/modified_file.jsonl', bucket_name, f"keywords/{origin_file_path}/{origin_file_name}")
+        if OUTPUT_FORMAT != "jsonl":
+            upload_parquet(s3, bucket_name, records, origin_file_path, origin_file_name)
     except Exception as e:
 
         logging.info("파일 업로드 실패", e.with_traceback())
 
 
+def upload_parquet(s3, bucket_name, records, crawl_hour, file_name):
+    """
+    키워드 추출 결과를 크롤링 시각, 커뮤니티, 차종으로 파티셔닝된 Parquet으로 업로드
+    key: keywords_parquet/crawl_hour=2024-08-10T14-00-00/data_source=dc/model=아이오닉6/dc_아이오닉6_2024-08-10T14-00-00.parquet
+    """
+    import pyarrow.parquet as pq
+
+    # 파일 이름: {data_source}_{model}_{crawl_hour}.jsonl
+    data_source, car_model, _ = file_name.split('_')
+    base_name = file_name.rsplit('.', 1)[0]
+
+    local_file_path = '/tmp/modified_file.parquet'
+    pq.write_table(to_arrow_table(records, 'keywords', exclude=PARTITION_COLUMNS), local_file_path, compression='snappy')
+
+    s3.upload_file(
+        local_file_path,
+        bucket_name,
+        f"keywords_parquet/crawl_hour={crawl_hour}/data_source={data_source}/model={car_model}/{base_name}.parquet",
+    )
+
+
 @app.route('/keyword_extraction', methods=['POST'])
 def extract_keywords():
     data = request.json
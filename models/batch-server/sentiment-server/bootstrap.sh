@@ -9,5 +9,6 @@ sudo pip install transformers[torch] flask boto3
 sudo mkdir -p /opt/flask/logs
 sudo chmod -R 777 /opt/flask/ 
 sudo aws s3 cp s3://monitordog-model/sentiment-analysis.py /opt/flask/app.py
+sudo aws s3 cp s3://monitordog-model/post_schema.py /opt/flask/post_schema.py
 sudo chmod 755 /opt/flask/app.py
 sudo nohup python3 /opt/flask/app.py > /opt/flask/logs/flask.log 2>&1 &
@@ -2,6 +2,7 @@ import boto3
 import json
 import logging
 from urllib import parse
+from post_schema import validate_post
 from flask import Flask, request, jsonify
 from optimum.onnxruntime import ORTModelForSequenceClassification
 from transformers import TextClassificationPipeline, AutoTokenizer
@@ -46,6 +47,13 @@ def batch_inference(bucket_name, file_name):
             # 결과 추가
             record['sentiment'] = sentiment
 
+            # 스키마와 맞지 않는 레코드는 다음 단계로 넘기지 않음
+            try:
+                validate_post(record, 'sentiment')
+            except ValueError as e:
+                logging.error(str(e))
+                continue
+
             # 수정된 행 저장
             outfile.write(json.dumps(record, ensure_ascii=False) + '\n')
     logging.info("jsonl inference 종료")
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+    DTW 구현 비교 벤치마크
+
+    - fastdtw: 기존 dtw_similarity_score (fastdtw + scipy euclidean 콜백)
+    - python: issue_score의 FastDTW 루프를 컴파일 없이 실행한 구현 (numba 구현의 기준)
+    - numpy: 셀 비용을 NumPy로 한 번에 계산하는 구현 (numba가 없을 때 사용)
+    - numba: python과 같은 루프를 numba로 컴파일한 구현 (numba가 설치된 경우)
+
+    generate_sparse_time_series로 만든 희소 시계열 쌍에 대해 쌍당 수행 시간과
+    fastdtw 대비 속도, 거리 비율, 유사도 차이를 출력합니다.
+    issue_score 구현은 fastdtw와 같은 알고리즘이므로 거리가 --tolerance보다 다르면 실패합니다.
+
+    사용법:
+        python transform/benchmarks/dtw_benchmark.py --num_pairs 50 --length 1488 --radius 1
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from fastdtw import fastdtw
+from scipy.spatial.distance import euclidean
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import issue_score
+from issue_score import dtw_distance, generate_sparse_time_series, to_sparse_points
+
+
+def fastdtw_distance(a, b, radius):
+    distance, _ = fastdtw(a, b, radius=radius, dist=euclidean)
+    return distance
+
+
+def run(distance, pairs, repeat):
+    """
+    모든 쌍의 거리를 계산하는 시간 중 가장 빠른 시간과 거리 배열을 반환
+    """
+    elapsed = []
+    distances = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        distances = np.array([distance(a, b) for a, b in pairs])
+        elapsed.append(time.perf_counter() - start)
+
+    return min(elapsed), distances
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_pairs", type=int, default=50)
+    parser.add_argument("--length", type=int, default=62 * 24)
+    parser.add_argument("--sparsity", type=float, default=0.7)
+    parser.add_argument("--radius", type=int, default=1)
+    parser.add_argument("--scale_factor", type=float, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="fastdtw와 허용하는 상대 거리 차이")
+    args = parser.parse_args()
+
+    np.random.seed(0)
+    pairs = []
+    while len(pairs) < args.num_pairs:
+        a = to_sparse_points(generate_sparse_time_series(np.random.rand() * 6, args.length, args.sparsity))
+        b = to_sparse_points(generate_sparse_time_series(np.random.rand() * 6, args.length, args.sparsity))
+        if len(a) > 0 and len(b) > 0:
+            pairs.append((a, b))
+
+    engines = {
+        "fastdtw": lambda a, b: fastdtw_distance(a, b, args.radius),
+        "python": lambda a, b: dtw_distance(a, b, radius=args.radius, engine="python"),
+        "numpy": lambda a, b: dtw_distance(a, b, radius=args.radius, engine="numpy"),
+    }
+    if issue_score.njit is not None:
+        # 첫 호출에서 컴파일되므로 측정 전에 한 번 실행
+        dtw_distance(pairs[0][0], pairs[0][1], radius=args.radius, engine="numba")
+        engines["numba"] = lambda a, b: dtw_distance(a, b, radius=args.radius, engine="numba")
+
+    results = {name: run(distance, pairs, args.repeat) for name, distance in engines.items()}
+
+    num_points = np.mean([len(a) for a, _ in pairs])
+    print(f"pairs: {args.num_pairs}, length: {args.length}, nonzero points: {num_points:.0f}, radius: {args.radius}")
+
+    base_time, base_distances = results["fastdtw"]
+    base_scores = np.exp(-base_distances / args.scale_factor)
+    for name, (elapsed, distances) in results.items():
+        scores = np.exp(-distances / args.scale_factor)
+        print(
+            f"{name:8}: {elapsed / args.num_pairs * 1000:8.2f} ms/pair, "
+            f"speedup {base_time / elapsed:6.1f}x, "
+            f"distance / fastdtw {np.mean(distances / base_distances):.3f}, "
+            f"mean |similarity - fastdtw| {np.abs(scores - base_scores).mean():.4f}"
+        )
+
+    mismatched = [
+        name
+        for name, (_, distances) in results.items()
+        if not np.allclose(distances, base_distances, rtol=args.tolerance, atol=0)
+    ]
+    if mismatched:
+        raise SystemExit(f"distance differs from fastdtw: {', '.join(mismatched)}")
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+    이슈화 점수, 유사도 계산 벤치마크
+
+    키워드 x 과거 이슈 x 시간(기본 62일 x 24시간 + 1) 크기의 희소한 시간별 조회수/추천수/댓글수를 만들어
+    - 이슈화 점수: get_issue_score (셀 단위) / NumPy 벡터 연산
+    - 유사도: dtw_similarity_score (쌍 단위) / batch_dtw_similarity_score (키워드 단위) / search_similar_issues (top-k)
+    의 처리량, 쌍당 지연 시간(p50, p95), 최대 메모리를 측정하고 JSON 리포트로 출력합니다.
+    새 DTW나 점수 계산 구현은 engines에 추가해 같은 데이터로 비교할 수 있습니다.
+
+    사용법:
+        python transform/benchmarks/similarity_benchmark.py --num_keywords 50 --num_past_issues 20 --output report.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import issue_score
+from issue_score import (
+    batch_dtw_similarity_score,
+    dtw_similarity_score,
+    get_issue_score,
+    make_signatures,
+    search_similar_issues,
+)
+
+
+def make_hourly_counts(rng, num_series, hours):
+    """
+    게시글이 올라온 시간에만 값이 있는 시간별 조회수, 추천수, 댓글수
+    키워드마다 평소 활동 비율이 다르고, 한 번의 이슈 구간에서 활동과 반응이 몰리도록 생성
+    """
+    t = np.arange(hours)
+    activity = rng.uniform(0.02, 0.3, size=(num_series, 1))
+    peak = rng.integers(0, hours, size=(num_series, 1))
+    width = rng.uniform(12, 24 * 7, size=(num_series, 1))
+    burst = np.exp(-0.5 * ((t - peak) / width) ** 2)
+
+    active = rng.random((num_series, hours)) < np.minimum(activity + burst, 1.0)
+    scale = 1 + 20 * burst
+    viewed = np.where(active, rng.poisson(200 * scale), 0)
+    liked = np.where(active, rng.poisson(3 * scale), 0)
+    num_of_comments = np.where(active, rng.poisson(10 * scale), 0)
+
+    return viewed, liked, num_of_comments
+
+
+def issue_score_loop(viewed, liked, num_of_comments):
+    return np.array(
+        [
+            [get_issue_score(v, l, c) if v or l or c else 0.0 for v, l, c in zip(*row)]
+            for row in zip(viewed, liked, num_of_comments)
+        ]
+    )
+
+
+def issue_score_vectorized(viewed, liked, num_of_comments):
+    return np.where(
+        (viewed > 0) | (liked > 0) | (num_of_comments > 0),
+        viewed + np.log1p(liked) + np.log1p(num_of_comments),
+        0.0,
+    )
+
+
+def similarity_pairwise(keywords, past_issues, signatures, args):
+    return [
+        np.array([dtw_similarity_score(k, p, args.scale_factor, args.radius) for p in past_issues])
+        for k in keywords
+    ]
+
+
+def similarity_batch(keywords, past_issues, signatures, args):
+    return [
+        batch_dtw_similarity_score(k, signatures["points"], args.scale_factor, args.radius)
+        for k in keywords
+    ]
+
+
+def similarity_top_k(keywords, past_issues, signatures, args):
+    return [
+        search_similar_issues(k, signatures, k=args.top_k, scale_factor=args.scale_factor, radius=args.radius)
+        for k in keywords
+    ]
+
+
+SCORE_ENGINES = {
+    "get_issue_score": issue_score_loop,
+    "vectorized": issue_score_vectorized,
+}
+
+SIMILARITY_ENGINES = {
+    "dtw_similarity_score": similarity_pairwise,
+    "batch_dtw_similarity_score": similarity_batch,
+    "search_similar_issues": similarity_top_k,
+}
+
+
+def measure(function, *function_args):
+    """
+    수행 시간과 tracemalloc 기준 최대 메모리 측정
+    tracemalloc이 수행 시간을 늘리므로 메모리는 한 번 더 실행해서 측정
+    """
+    start = time.perf_counter()
+    result = function(*function_args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    function(*function_args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, elapsed, peak
+
+
+def per_keyword_latencies(engine, keywords, past_issues, signatures, args):
+    """
+    키워드 하나를 모든 과거 이슈와 비교하는 시간을 과거 이슈 수로 나눈 쌍당 지연 시간
+    """
+    latencies = []
+    for keyword in keywords:
+        start = time.perf_counter()
+        engine([keyword], past_issues, signatures, args)
+        latencies.append((time.perf_counter() - start) / len(past_issues))
+
+    return np.array(latencies)
+
+
+def top_match_agreement(results, reference):
+    """
+    키워드마다 가장 유사한 과거 이슈가 기준 엔진과 같은 비율
+    """
+    def top(result):
+        if isinstance(result, list):
+            return result[0]["index"] if result else -1
+        return int(np.argmax(result))
+
+    return float(np.mean([top(r) == top(b) for r, b in zip(results, reference)]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_keywords", type=int, default=50)
+    parser.add_argument("--num_past_issues", type=int, default=20)
+    parser.add_argument("--hours", type=int, default=62 * 24 + 1)
+    parser.add_argument("--radius", type=int, default=1)
+    parser.add_argument("--scale_factor", type=float, default=50)
+    parser.add_argument("--top_k", type=int, default=1)
+    parser.add_argument("--score_engines", default=",".join(SCORE_ENGINES))
+    parser.add_argument("--similarity_engines", default=",".join(SIMILARITY_ENGINES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON 리포트 경로, 없으면 표준 출력")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    keyword_counts = make_hourly_counts(rng, args.num_keywords, args.hours)
+    past_issue_counts = make_hourly_counts(rng, args.num_past_issues, args.hours)
+
+    report = {
+        "config": vars(args),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "numba": issue_score.njit is not None,
+            "machine": platform.machine(),
+        },
+        "issue_score": {},
+        "similarity": {},
+    }
+
+    num_cells = args.num_keywords * args.hours
+    for name in args.score_engines.split(","):
+        _, elapsed, peak = measure(SCORE_ENGINES[name], *keyword_counts)
+        report["issue_score"][name] = {
+            "cells": num_cells,
+            "seconds": elapsed,
+            "cells_per_second": num_cells / elapsed,
+            "peak_memory_bytes": peak,
+        }
+
+    keywords = list(issue_score_vectorized(*keyword_counts))
+    past_issues = list(issue_score_vectorized(*past_issue_counts))
+    signatures = make_signatures([f"past_issue_{i}" for i in range(len(past_issues))], past_issues)
+
+    if issue_score.njit is not None:
+        # numba는 첫 호출에서 컴파일되므로 측정 전에 한 번 실행
+        batch_dtw_similarity_score(keywords[0], past_issues[:1], args.scale_factor, args.radius)
+
+    num_pairs = args.num_keywords * args.num_past_issues
+    reference = None
+    for name in args.similarity_engines.split(","):
+        engine = SIMILARITY_ENGINES[name]
+        results, elapsed, peak = measure(engine, keywords, past_issues, signatures, args)
+        latencies = per_keyword_latencies(engine, keywords, past_issues, signatures, args)
+        reference = reference or results
+
+        report["similarity"][name] = {
+            "pairs": num_pairs,
+            "seconds": elapsed,
+            "pairs_per_second": num_pairs / elapsed,
+            "pair_latency_ms_p50": float(np.percentile(latencies, 50) * 1000),
+            "pair_latency_ms_p95": float(np.percentile(latencies, 95) * 1000),
+            "peak_memory_bytes": peak,
+            "top_match_agreement": top_match_agreement(results, reference),
+        }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
@@ -6,6 +6,7 @@ from io import BytesIO
 
 import boto3
 from data_formatting import preprocess_post
+from post_schema import validate_post
 
 
 s3_client = boto3.client('s3')
@@ -45,6 +46,9 @@ def preprocess(input_file_obj, output_file_obj, data_source, car_model):
             post_info['data_source'] = data_source
             post_info['model'] = car_model
 
+            # 스키마와 맞지 않는 레코드는 다음 단계로 넘기지 않음
+            validate_post(post_info, 'formatted')
+
             processed_line = (json.dumps(post_info, ensure_ascii=False) + '\n').encode('utf-8')
 
             output_file_obj.write(processed_line)
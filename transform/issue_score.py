@@ -4,8 +4,12 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from scipy.stats import zscore
-from scipy.spatial.distance import euclidean
-from fastdtw import fastdtw
+
+# numba가 있으면 FastDTW 루프를 컴파일해서 사용하고, 없으면 셀 비용을 NumPy로 한 번에 계산하는 구현을 사용
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 
 def get_issue_score(viewed: float, liked: float, num_of_comments: float) -> float:
@@ -19,42 +23,41 @@ def get_issue_score(viewed: float, liked: float, num_of_comments: float) -> floa
     return viewed + log(1 + liked) + log(1 + num_of_comments)
 
 
-def dtw_similarity_score(a, b, scale_factor: float = 50, radius: int = 1) -> float:
+def get_issue_score_column(viewed, liked, num_of_comments):
     """
-    정규화된 DTW 유사도 계산
-    :param x: 그래프를 나타내는 1차원 리스트 (pd.Series)
-    :param y: 그래프를 나타내는 1차원 리스트 (pd.Series), x와 길이가 동일해야 정확한 값이 나옴
-    :param radius: Fast DTW 알고리즘에서 경로를 탐색할 범위
-    :return: [0,1] 사이의 실수값, 1에 가까울수록 유사한 그래프
+    get_issue_score와 같은 계산을 Spark 컬럼 식으로 작성
+    Python UDF를 거치지 않아 데이터가 JVM 밖으로 나가지 않음
+    :param viewed: 조회수 총합 컬럼 (Column 또는 컬럼 이름)
+    :param liked: 추천 수 총합 컬럼 (Column 또는 컬럼 이름)
+    :param num_of_comments: 댓글 수 총합 컬럼 (Column 또는 컬럼 이름)
+    :return: 이슈화 점수 Column
     """
-    # 입력이 pandas Series인지 확인
-    if isinstance(a, pd.Series):
-        a = a.to_numpy()
-    if isinstance(b, pd.Series):
-        b = b.to_numpy()
+    # pyspark는 EMR에서만 필요하므로 사용할 때 import
+    from pyspark.sql.functions import col, log1p
 
-    a_x = np.arange(len(a))[a != 0]
-    b_x = np.arange(len(b))[b != 0]
+    if isinstance(viewed, str):
+        viewed = col(viewed)
 
-    a_nonzero = a[a != 0]
-    b_nonzero = b[b != 0]
+    return viewed + log1p(liked) + log1p(num_of_comments)
 
-    num_a_nonzero = len(a_nonzero)
-    num_b_nonzero = len(b_nonzero)
 
-    # 비영 영역이 없는 경우 처리
-    if num_a_nonzero == 0 and num_b_nonzero == 0:
-        return 0.0 # 아무런 신호가 없는 경우 무시하기 위해 0 반환 
-    elif num_a_nonzero == 0 or num_b_nonzero == 0:
-        return 0.0
-    
-    a_nonzero = zscore(a_nonzero)
-    b_nonzero = zscore(b_nonzero)
+def dtw_similarity_score(a, b, scale_factor: float = 50, radius: int = 1) -> float:
+    """
+    정규화된 DTW 유사도 계산
+    :param a: 그래프를 나타내는 1차원 리스트 (pd.Series)
+    :param b: 그래프를 나타내는 1차원 리스트 (pd.Series), a와 길이가 동일해야 정확한 값이 나옴
+    :param scale_factor: 거리를 유사도로 바꿀 때 사용하는 스케일
+    :param radius: fastdtw의 radius, None이면 전체 영역을 탐색하는 정확한 DTW
+    :return: [0,1] 사이의 실수값, 1에 가까울수록 유사한 그래프
+    """
+    a_nonzero = to_sparse_points(a)
+    b_nonzero = to_sparse_points(b)
 
-    a_nonzero = np.vstack((a_x, a_nonzero)).T
-    b_nonzero = np.vstack((b_x, b_nonzero)).T
+    # 비영 영역이 없는 경우 처리
+    if len(a_nonzero) == 0 or len(b_nonzero) == 0:
+        return 0.0 # 아무런 신호가 없는 경우 무시하기 위해 0 반환
 
-    raw_distance, _ = fastdtw(a_nonzero, b_nonzero, radius=radius, dist=euclidean)
+    raw_distance = dtw_distance(a_nonzero, b_nonzero, radius=radius)
 
     # 정규화된 거리 계산 (0과 1 사이의 값)
     similarity_score = np.exp(-raw_distance / scale_factor)
@@ -62,6 +65,681 @@ def dtw_similarity_score(a, b, scale_factor: float = 50, radius: int = 1) -> flo
     return similarity_score
 
 
+def _reduce_by_half(points):
+    """
+    이웃한 두 점의 평균으로 길이를 절반으로 줄임 (홀수면 마지막 점은 버림, fastdtw와 동일)
+    """
+    n = len(points) // 2
+    reduced = np.empty((n, 2))
+    for i in range(n):
+        reduced[i, 0] = (points[2 * i, 0] + points[2 * i + 1, 0]) / 2
+        reduced[i, 1] = (points[2 * i, 1] + points[2 * i + 1, 1]) / 2
+
+    return reduced
+
+
+def _expand_window(path_i, path_j, n, m, radius):
+    """
+    절반 해상도의 경로를 radius만큼 넓힌 뒤 두 배로 늘려 행마다 계산할 열 구간 [lo, hi]를 만듦
+    경로는 단조롭게 이어지므로 행마다 구간이 하나로 이어지며, fastdtw의 __expand_window와 같은 셀을 고름
+    """
+    rows = (n - 1) // 2 + 1
+    left = np.full(rows, m, dtype=np.int64)
+    right = np.full(rows, -m - 2, dtype=np.int64)
+    for p in range(len(path_i)):
+        for r in range(max(path_i[p] - radius, 0), min(path_i[p] + radius, rows - 1) + 1):
+            left[r] = min(left[r], path_j[p] - radius)
+            right[r] = max(right[r], path_j[p] + radius)
+
+    lo = np.empty(n, dtype=np.int64)
+    hi = np.empty(n, dtype=np.int64)
+    # fastdtw처럼 윗 행 구간의 시작보다 앞의 열은 사용하지 않음
+    start = 0
+    for i in range(n):
+        lo[i] = max(2 * left[i // 2], start)
+        hi[i] = min(2 * right[i // 2] + 1, m - 1)
+        if lo[i] <= hi[i]:
+            start = lo[i]
+
+    return lo, hi
+
+
+def _window_dtw(x, y, lo, hi, with_path):
+    """
+    행 i에서 [lo[i], hi[i]] 열만 계산하는 DTW, 누적 비용은 두 행만 저장하고 경로용 방향만 구간 크기만큼 저장
+    같은 비용이면 위, 왼쪽, 대각선 순으로 고름 (fastdtw의 __dtw와 동일)
+    :return: (거리, 경로 행 인덱스, 경로 열 인덱스), with_path가 아니거나 경로가 없으면 빈 경로
+    """
+    n, m = len(x), len(y)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    for i in range(n):
+        offsets[i + 1] = offsets[i] + max(hi[i] - lo[i] + 1, 0)
+    steps = np.empty(offsets[n] if with_path else 0, dtype=np.int8)
+
+    previous = np.full(m, np.inf)
+    current = np.full(m, np.inf)
+    for i in range(n):
+        for j in range(lo[i], hi[i] + 1):
+            dx = x[i, 0] - y[j, 0]
+            dy = x[i, 1] - y[j, 1]
+            dt = np.sqrt(dx * dx + dy * dy)
+
+            if i == 0:
+                up = np.inf
+                diagonal = 0.0 if j == 0 else np.inf
+            else:
+                up = previous[j] if lo[i - 1] <= j <= hi[i - 1] else np.inf
+                diagonal = previous[j - 1] if j >= 1 and lo[i - 1] <= j - 1 <= hi[i - 1] else np.inf
+            left = current[j - 1] if j > lo[i] else np.inf
+
+            best, step = up + dt, 0
+            if left + dt < best:
+                best, step = left + dt, 1
+            if diagonal + dt < best:
+                best, step = diagonal + dt, 2
+            current[j] = best
+            if with_path:
+                steps[offsets[i] + j - lo[i]] = step
+        previous, current = current, previous
+
+    distance = previous[m - 1] if lo[n - 1] <= m - 1 <= hi[n - 1] else np.inf
+    path_i = np.empty(0, dtype=np.int64)
+    path_j = np.empty(0, dtype=np.int64)
+    if not with_path or not np.isfinite(distance):
+        return distance, path_i, path_j
+
+    path_i = np.empty(n + m, dtype=np.int64)
+    path_j = np.empty(n + m, dtype=np.int64)
+    length = 0
+    i, j = n - 1, m - 1
+    while i >= 0 and j >= 0:
+        path_i[length] = i
+        path_j[length] = j
+        length += 1
+        step = steps[offsets[i] + j - lo[i]]
+        if step != 1:
+            i -= 1
+        if step != 0:
+            j -= 1
+
+    return distance, path_i[:length], path_j[:length]
+
+
+def _reduce_by_half_numpy(points):
+    # _reduce_by_half와 같은 연산을 배열 단위로 계산
+    n = len(points) // 2
+
+    return (points[0 : 2 * n : 2] + points[1 : 2 * n : 2]) / 2
+
+
+def _expand_window_numpy(path_i, path_j, n, m, radius):
+    """
+    _expand_window와 같은 구간을 만들되, 경로 주변 행의 최솟값/최댓값은 배열 단위로 계산
+    """
+    rows = (n - 1) // 2 + 1
+    left = np.full(rows, m, dtype=np.int64)
+    right = np.full(rows, -m - 2, dtype=np.int64)
+    for d in range(-radius, radius + 1):
+        r = path_i + d
+        valid = (r >= 0) & (r <= rows - 1)
+        np.minimum.at(left, r[valid], path_j[valid] - radius)
+        np.maximum.at(right, r[valid], path_j[valid] + radius)
+
+    lo = np.maximum(2 * np.repeat(left, 2)[:n], 0)
+    hi = np.minimum(2 * np.repeat(right, 2)[:n] + 1, m - 1)
+    # 윗 행 구간의 시작보다 앞의 열은 사용하지 않음 (행 수만큼만 반복)
+    start = 0
+    for i in range(n):
+        lo[i] = max(lo[i], start)
+        if lo[i] <= hi[i]:
+            start = lo[i]
+
+    return lo, hi
+
+
+def _window_dtw_numpy(x, y, lo, hi, with_path):
+    """
+    _window_dtw와 같은 DTW, window 안 모든 셀의 비용(유클리드 거리)은 NumPy로 한 번에 계산하고
+    누적 비용은 왼쪽 셀에 의존하므로 Python 리스트로 순서대로 계산
+    누적합을 배열 연산(누적 최솟값)으로 바꾸면 덧셈 순서가 달라져 fastdtw와 같은 값이 나오지 않음
+    """
+    n, m = len(x), len(y)
+    widths = np.maximum(hi - lo + 1, 0)
+    offsets = np.concatenate(([0], np.cumsum(widths)))
+    rows = np.repeat(np.arange(n), widths)
+    cols = np.arange(offsets[n]) - np.repeat(offsets[:n] - lo, widths)
+    dx = x[rows, 0] - y[cols, 0]
+    dy = x[rows, 1] - y[cols, 1]
+    costs = np.sqrt(dx * dx + dy * dy).tolist()
+
+    lo, hi, offsets = lo.tolist(), hi.tolist(), offsets.tolist()
+    inf = float("inf")
+    total = [inf] * offsets[n]
+    steps = [0] * offsets[n]
+    for i in range(n):
+        base = offsets[i] - lo[i]
+        if i > 0:
+            lo_up, hi_up, base_up = lo[i - 1], hi[i - 1], offsets[i - 1] - lo[i - 1]
+        left = inf
+        for j in range(lo[i], hi[i] + 1):
+            dt = costs[base + j]
+            if i == 0:
+                up = inf
+                diagonal = 0.0 if j == 0 else inf
+            else:
+                up = total[base_up + j] if lo_up <= j <= hi_up else inf
+                diagonal = total[base_up + j - 1] if lo_up <= j - 1 <= hi_up else inf
+
+            best, step = up + dt, 0
+            if left + dt < best:
+                best, step = left + dt, 1
+            if diagonal + dt < best:
+                best, step = diagonal + dt, 2
+            total[base + j] = best
+            steps[base + j] = step
+            left = best
+
+    distance = total[offsets[n - 1] - lo[n - 1] + m - 1] if lo[n - 1] <= m - 1 <= hi[n - 1] else inf
+    if not with_path or not np.isfinite(distance):
+        return distance, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    path_i = []
+    path_j = []
+    i, j = n - 1, m - 1
+    while i >= 0 and j >= 0:
+        path_i.append(i)
+        path_j.append(j)
+        step = steps[offsets[i] - lo[i] + j]
+        if step != 1:
+            i -= 1
+        if step != 0:
+            j -= 1
+
+    return distance, np.array(path_i, dtype=np.int64), np.array(path_j, dtype=np.int64)
+
+
+def _make_fastdtw(reduce_by_half, expand_window, window_dtw):
+    """
+    주어진 단계 함수로 FastDTW 함수를 만듦
+    numba로 컴파일한 함수와 컴파일하지 않은 함수를 섞지 않도록 단계 함수를 모듈 전역 대신 인자로 받음
+    """
+
+    def fastdtw_loop(x, y, radius):
+        """
+        fastdtw 라이브러리와 같은 FastDTW (radius + 2보다 짧아질 때까지 절반으로 줄인 뒤,
+        거친 해상도의 경로 주변 window 안에서만 DTW를 계산하며 해상도를 되돌림)
+        재귀 대신 반복문으로 작성하고 window를 행별 구간으로 저장해 메모리는 window 크기에 비례
+        :param radius: 음수면 전체 영역을 탐색하는 정확한 DTW
+        """
+        xs = [x]
+        ys = [y]
+        if radius >= 0:
+            while len(xs[-1]) >= radius + 2 and len(ys[-1]) >= radius + 2:
+                xs.append(reduce_by_half(xs[-1]))
+                ys.append(reduce_by_half(ys[-1]))
+
+        level = len(xs) - 1
+        lo = np.zeros(len(xs[level]), dtype=np.int64)
+        hi = np.full(len(xs[level]), len(ys[level]) - 1, dtype=np.int64)
+        distance, path_i, path_j = window_dtw(xs[level], ys[level], lo, hi, level > 0)
+
+        for level in range(len(xs) - 2, -1, -1):
+            if not np.isfinite(distance):
+                return np.inf
+            lo, hi = expand_window(path_i, path_j, len(xs[level]), len(ys[level]), radius)
+            distance, path_i, path_j = window_dtw(xs[level], ys[level], lo, hi, level > 0)
+
+        return distance
+
+    return fastdtw_loop
+
+
+# engine별 FastDTW 함수
+# - python: 셀마다 계산하는 루프를 컴파일 없이 실행 (numba 구현의 기준)
+# - numpy: 셀 비용은 NumPy로 한 번에 계산하고 누적 비용만 순서대로 계산 (numba가 없을 때 사용)
+# - numba: python과 같은 루프를 컴파일해서 실행
+FASTDTW_ENGINES = {
+    "python": _make_fastdtw(_reduce_by_half, _expand_window, _window_dtw),
+    "numpy": _make_fastdtw(_reduce_by_half_numpy, _expand_window_numpy, _window_dtw_numpy),
+}
+if njit is not None:
+    FASTDTW_ENGINES["numba"] = njit(nogil=True)(
+        _make_fastdtw(
+            njit(nogil=True)(_reduce_by_half),
+            njit(nogil=True)(_expand_window),
+            njit(nogil=True)(_window_dtw),
+        )
+    )
+
+
+def dtw_distance(a: np.ndarray, b: np.ndarray, radius: int = 1, engine: str = "auto") -> float:
+    """
+    두 점 배열 사이의 FastDTW 거리 (셀 비용은 유클리드 거리), fastdtw(a, b, radius, dist=euclidean)와 같은 값
+    :param a: to_sparse_points로 만든 (m, 2) 크기의 점 배열, 비어있지 않아야 함
+    :param b: to_sparse_points로 만든 (n, 2) 크기의 점 배열, 비어있지 않아야 함
+    :param radius: fastdtw의 radius, None이면 전체 영역을 탐색하는 정확한 DTW
+    :param engine: auto(numba가 있으면 numba, 없으면 numpy), numba, numpy, python
+    :return: DTW 거리
+    """
+    return float(batch_dtw_distance(b, [a], radius=radius, engine=engine)[0])
+
+
+def to_sparse_points(series) -> np.ndarray:
+    """
+    시계열에서 0이 아닌 구간만 골라 (시간 인덱스, z-score) 2차원 점으로 변환
+    dtw_similarity_score 내부의 전처리와 동일한 연산 (z-score가 nan이 되는 경우만 0으로 처리)
+    :param series: 그래프를 나타내는 1차원 리스트 (pd.Series, np.ndarray, list)
+    :return: (비영 개수, 2) 크기의 배열, 비영 값이 없으면 (0, 2) 크기의 빈 배열
+    """
+    if isinstance(series, pd.Series):
+        series = series.to_numpy()
+    series = np.asarray(series, dtype=float)
+
+    nonzero_mask = series != 0
+    if not nonzero_mask.any():
+        return np.empty((0, 2))
+
+    x = np.arange(len(series))[nonzero_mask]
+    # 비영 값이 하나뿐이거나 모두 같으면 표준편차가 0이라 nan이 되므로 평균과 같은 0으로 처리
+    nonzero = np.nan_to_num(zscore(series[nonzero_mask]))
+
+    return np.vstack((x, nonzero)).T
+
+
+def batch_dtw_distance(query: np.ndarray, candidates: list, radius: int = 1, engine: str = "auto") -> np.ndarray:
+    """
+    하나의 점 배열(query)과 여러 점 배열(candidates) 사이의 FastDTW 거리를 한 번에 계산
+    FastDTW는 인자 순서에 따라 결과가 조금 다를 수 있어, 기존 UDF(과거 이슈, 현재 이슈)처럼 fastdtw(candidate, query)와 같은 값
+    :param query: to_sparse_points로 만든 (m, 2) 크기의 점 배열
+    :param candidates: to_sparse_points로 만든 점 배열 리스트
+    :param radius: fastdtw의 radius, None이면 전체 영역을 탐색하는 정확한 DTW
+    :param engine: auto(numba가 있으면 numba, 없으면 numpy), numba, numpy, python(numba와 같은 루프를 컴파일 없이 실행)
+    :return: 각 후보와의 DTW 거리, 어느 한쪽이 비어있으면 nan
+    """
+    if engine == "auto":
+        engine = "numba" if "numba" in FASTDTW_ENGINES else "numpy"
+    if engine == "numba" and njit is None:
+        raise ValueError("Cannot use engine 'numba' without numba installed")
+    if engine not in FASTDTW_ENGINES:
+        raise ValueError(f"Cannot use engine '{engine}'")
+
+    kernel = FASTDTW_ENGINES[engine]
+    radius = -1 if radius is None else radius
+
+    distances = np.full(len(candidates), np.nan)
+    if len(query) == 0:
+        return distances
+
+    # numba는 배열 형식마다 따로 컴파일하므로 C 순서 float 배열로 맞춤 (to_sparse_points 결과는 F 순서)
+    query = np.ascontiguousarray(query, dtype=float)
+    for k, candidate in enumerate(candidates):
+        if len(candidate) > 0:
+            distances[k] = kernel(np.ascontiguousarray(candidate, dtype=float), query, radius)
+
+    return distances
+
+
+def batch_dtw_similarity_score(a, bs: list, scale_factor: float = 50, radius: int = 1) -> np.ndarray:
+    """
+    하나의 그래프와 여러 그래프 사이의 정규화된 DTW 유사도를 한 번에 계산
+    전처리(비영 구간, z-score), FastDTW 거리, 거리 -> 유사도 변환 모두 dtw_similarity_score와 동일
+    :param a: 기준 그래프 (pd.Series, np.ndarray, list) 또는 to_sparse_points 결과
+    :param bs: 비교할 그래프 리스트 (a와 같은 형식)
+    :param scale_factor: 거리를 유사도로 바꿀 때 사용하는 스케일
+    :param radius: fastdtw의 radius, None이면 전체 영역 탐색
+    :return: [0,1] 사이의 실수 배열, 1에 가까울수록 유사한 그래프
+    """
+    query = a if _is_sparse_points(a) else to_sparse_points(a)
+    candidates = [b if _is_sparse_points(b) else to_sparse_points(b) for b in bs]
+
+    distances = batch_dtw_distance(query, candidates, radius=radius)
+
+    # 비영 영역이 없는 경우는 dtw_similarity_score와 같이 0 반환
+    empty = np.array([len(query) == 0 or len(c) == 0 for c in candidates], dtype=bool)
+    similarity_scores = np.exp(-distances / scale_factor)
+    similarity_scores[empty] = 0.0
+
+    return similarity_scores
+
+
+def _is_sparse_points(x) -> bool:
+    return isinstance(x, np.ndarray) and x.ndim == 2 and x.shape[1] == 2
+
+
+def _band_offsets(n: int, m: int, radius):
+    """
+    Sakoe-Chiba 밴드, (i, j) 셀은 lower <= j - i <= upper 일 때만 경로에 쓸 수 있음 (길이 차이만큼 넓어짐)
+    radius가 None이면 모든 셀
+    """
+    if radius is None:
+        return -n, m
+
+    return -radius - max(n - m, 0), radius + max(m - n, 0)
+
+
+def make_range_tables(points: np.ndarray):
+    """
+    구간 최솟값/최댓값을 O(1)에 구하기 위한 sparse table
+    tables[0][l, s]는 points[s : s + 2**l]의 좌표별 최솟값, tables[1]은 최댓값
+    :param points: (n, 2) 크기의 점 배열
+    :return: ((L, n, 2) 최솟값 테이블, (L, n, 2) 최댓값 테이블)
+    """
+    n = len(points)
+    levels = int(np.log2(n)) + 1 if n > 0 else 1
+
+    mins = np.empty((levels, n, 2))
+    maxs = np.empty((levels, n, 2))
+    mins[0] = maxs[0] = points
+    for level in range(1, levels):
+        width = 1 << (level - 1)
+        mins[level] = mins[level - 1]
+        maxs[level] = maxs[level - 1]
+        mins[level, : n - width] = np.minimum(mins[level - 1, : n - width], mins[level - 1, width:])
+        maxs[level, : n - width] = np.maximum(maxs[level - 1, : n - width], maxs[level - 1, width:])
+
+    return mins, maxs
+
+
+def _envelope_bound(points: np.ndarray, other_tables, lower: int, upper: int) -> float:
+    """
+    points의 각 점(행)과, 밴드 안에서 그 점과 짝지어질 수 있는 other 점들을 감싸는 상자 사이 거리의 합
+    시간 좌표는 상자 대신 시간이 가장 가까운 other 점까지의 차이를 사용 (시간 인덱스는 정렬되어 있음)
+    경로는 모든 행을 한 번 이상 지나고 이 거리는 어떤 셀의 비용보다 작으므로 DTW 거리의 하한
+    """
+    mins, maxs = other_tables
+    m = mins.shape[1]
+
+    i = np.arange(len(points))
+    start = np.clip(i + lower, 0, m - 1)
+    end = np.clip(i + upper, 0, m - 1)
+
+    level = np.floor(np.log2(end - start + 1)).astype(int)
+    second = end - (1 << level) + 1
+    low = np.minimum(mins[level, start], mins[level, second])
+    high = np.maximum(maxs[level, start], maxs[level, second])
+
+    gap = np.maximum(np.maximum(low - points, points - high), 0)
+
+    # 전체 영역을 탐색하면 상자의 시간 범위가 넓어 하한이 거의 0이 되므로, 구간 안에서 시간이 가장 가까운 점을 찾음
+    times = mins[0, :, 0]
+    after = np.clip(np.searchsorted(times, points[:, 0]), start, end)
+    before = np.clip(after - 1, start, end)
+    gap[:, 0] = np.minimum(np.abs(times[after] - points[:, 0]), np.abs(times[before] - points[:, 0]))
+
+    return float(np.sqrt((gap**2).sum(axis=1)).sum())
+
+
+def lb_kim(query: np.ndarray, candidate: np.ndarray) -> float:
+    """
+    경로는 항상 첫 점끼리, 마지막 점끼리의 셀을 지나므로 두 셀의 비용 합은 DTW 거리의 하한
+    """
+    first = np.linalg.norm(query[0] - candidate[0])
+    if len(query) == 1 and len(candidate) == 1:
+        return float(first)
+
+    return float(first + np.linalg.norm(query[-1] - candidate[-1]))
+
+
+def lb_keogh(query: np.ndarray, candidate: np.ndarray, radius: int = 1, query_tables=None, candidate_tables=None) -> float:
+    """
+    2차원 점에 대한 LB_Keogh, 양쪽 방향의 하한 중 큰 값
+    :param query: (m, 2) 크기의 점 배열
+    :param candidate: (n, 2) 크기의 점 배열
+    :param radius: Sakoe-Chiba 밴드 폭, 경로가 밴드 안에 있을 때만 하한이므로 FastDTW 거리에는 None(전체 영역)을 사용
+    :param query_tables: make_range_tables(query), 여러 후보와 비교할 때 한 번만 만들어 전달
+    :param candidate_tables: make_range_tables(candidate)
+    :return: DTW 거리의 하한
+    """
+    query_tables = query_tables or make_range_tables(query)
+    candidate_tables = candidate_tables or make_range_tables(candidate)
+
+    lower, upper = _band_offsets(len(candidate), len(query), radius)
+
+    return max(
+        _envelope_bound(candidate, query_tables, lower, upper),
+        _envelope_bound(query, candidate_tables, -upper, -lower),
+    )
+
+
+def dtw_top_k(query: np.ndarray, candidates: list, k: int = 1, radius: int = 1, batch_size: int = 8, candidate_tables: list = None, max_distance: float = np.inf):
+    """
+    하한(LB_Kim, LB_Keogh)으로 후보를 걸러 DTW 거리가 가장 작은 k개의 후보를 찾음
+    모든 후보의 DTW를 계산해 (거리, 인덱스) 순으로 정렬한 앞 k개와 같은 결과
+    FastDTW 경로는 radius 밴드를 벗어날 수 있으므로 LB_Keogh는 전체 영역 기준으로 계산
+    (FastDTW 거리 >= 정확한 DTW 거리 >= 하한)
+    :param query: to_sparse_points로 만든 (m, 2) 크기의 점 배열
+    :param candidates: to_sparse_points로 만든 점 배열 리스트
+    :param k: 찾을 후보 수
+    :param radius: fastdtw의 radius, None이면 전체 영역 탐색
+    :param batch_size: 한 번에 DTW를 계산할 후보 수
+    :param candidate_tables: 후보별 make_range_tables 결과 (없으면 새로 계산)
+    :param max_distance: 이보다 먼 후보는 계산하지 않고 거리를 inf로 반환
+    :return: (후보 인덱스 배열, DTW 거리 배열, 실제로 DTW를 계산한 후보 수), 비어있는 쪽이 있으면 거리는 inf
+    """
+    k = min(k, len(candidates))
+    lower_bounds = np.full(len(candidates), np.inf)
+
+    if len(query) > 0:
+        query_tables = make_range_tables(query)
+        for index, candidate in enumerate(candidates):
+            if len(candidate) == 0:
+                continue
+            lower_bounds[index] = max(
+                lb_kim(query, candidate),
+                lb_keogh(
+                    query,
+                    candidate,
+                    None,
+                    query_tables=query_tables,
+                    candidate_tables=candidate_tables[index] if candidate_tables else None,
+                ),
+            )
+
+    distances = np.full(len(candidates), np.inf)
+    computed = np.zeros(len(candidates), dtype=bool)
+
+    # 하한이 작은 후보부터 계산하고, 하한이 현재 k번째 거리보다 크면 남은 후보는 모두 건너뜀
+    # 비어있는 쪽이 있어 하한이 inf인 후보는 DTW가 nan이므로 max_distance와 상관없이 계산하지 않음
+    order = np.argsort(lower_bounds, kind="stable")
+    order = order[np.isfinite(lower_bounds[order]) & (lower_bounds[order] <= max_distance)]
+
+    position = 0
+    while position < len(order):
+        threshold = max_distance
+        if computed.sum() >= k:
+            threshold = min(threshold, np.sort(distances[computed])[k - 1])
+        if lower_bounds[order[position]] > threshold:
+            break
+
+        chunk = order[position : position + batch_size]
+        distances[chunk] = batch_dtw_distance(query, [candidates[index] for index in chunk], radius=radius)
+        computed[chunk] = True
+        position += batch_size
+
+    # nan은 정렬에서 가장 뒤로 가지만 유사도도 nan이 되므로 inf(유사도 0)로 바꿈
+    distances[np.isnan(distances) | (distances > max_distance)] = np.inf
+
+    # 계산하지 않은 후보는 inf로 남아 있으므로 (거리, 인덱스) 순으로 정렬하면 전체 계산과 같은 순서
+    top_k = np.lexsort((np.arange(len(candidates)), distances))[:k]
+
+    return top_k, distances[top_k], int(computed.sum())
+
+
+def dtw_similarity_top_k(a, bs: list, k: int = 1, scale_factor: float = 50, radius: int = 1, candidate_tables: list = None):
+    """
+    batch_dtw_similarity_score 결과에서 유사도가 가장 높은 k개만 구하는 것과 같지만 하한으로 DTW 계산을 건너뜀
+    :param a: 기준 그래프 (pd.Series, np.ndarray, list) 또는 to_sparse_points 결과
+    :param bs: 비교할 그래프 리스트 (a와 같은 형식)
+    :param k: 찾을 그래프 수
+    :param scale_factor: 거리를 유사도로 바꿀 때 사용하는 스케일
+    :param radius: fastdtw의 radius, None이면 전체 영역 탐색
+    :param candidate_tables: bs별 make_range_tables 결과 (make_signatures로 미리 만든 값)
+    :return: (bs 인덱스 배열, 유사도 배열), 유사도가 높은 순서
+    """
+    query = a if _is_sparse_points(a) else to_sparse_points(a)
+    candidates = [b if _is_sparse_points(b) else to_sparse_points(b) for b in bs]
+
+    indices, distances, _ = dtw_top_k(
+        query, candidates, k=k, radius=radius, candidate_tables=candidate_tables
+    )
+
+    # 비어있는 경우 거리가 inf이므로 유사도는 batch_dtw_similarity_score와 같이 0
+    return indices, np.exp(-distances / scale_factor)
+
+
+def window_points(points: np.ndarray, start: int, end: int) -> np.ndarray:
+    """
+    to_sparse_points 결과에서 [start, end) 시간 구간의 점만 골라 구간 안에서 다시 z-score
+    z-score는 선형 변환에 영향을 받지 않으므로 원래 값으로 구간을 자른 to_sparse_points(series[start:end])와 같음
+    :param points: to_sparse_points로 만든 점 배열
+    :param start: 구간 시작 인덱스
+    :param end: 구간 끝 인덱스 (포함하지 않음)
+    :return: 시간 인덱스가 start부터 0으로 시작하는 점 배열
+    """
+    mask = (points[:, 0] >= start) & (points[:, 0] < end)
+    if not mask.any():
+        return np.empty((0, 2))
+
+    return np.vstack((points[mask, 0] - start, np.nan_to_num(zscore(points[mask, 1])))).T
+
+
+def make_window_signatures(signatures: dict, start: int, end: int) -> dict:
+    """
+    시그니처의 과거 이슈마다 [start, end) 구간의 점과 하한 계산용 테이블을 만듦
+    :param signatures: make_signatures 또는 load_signatures 결과
+    :param start: 구간 시작 인덱스
+    :param end: 구간 끝 인덱스 (포함하지 않음)
+    :return: names, points(window_points), tables(make_range_tables)를 담은 dict
+    """
+    points = [window_points(p, start, end) for p in signatures["points"]]
+
+    return {
+        "names": signatures["names"],
+        "points": points,
+        "tables": [make_range_tables(p) for p in points],
+    }
+
+
+def search_similar_issues(series, signatures: dict, k: int = 5, windows: list = None, scale_factor: float = 50, radius: int = 1, min_similarity: float = 0.0, window_signatures: dict = None) -> list:
+    """
+    그래프 하나와 가장 비슷한 과거 이슈 k개를 여러 기간에 대해 찾음
+    과거 이슈는 시작 시간을 그래프의 시작 시간에 맞춘 것으로 보고, 기간마다 그래프의 마지막 window 시간과
+    같은 위치의 과거 이슈 구간을 비교 (예: 24, 24 * 7, 24 * 62)
+    windows가 None이면 그래프 전체와 과거 이슈 전체를 비교
+    :param series: 시간 순서의 그래프 (pd.Series, np.ndarray, list)
+    :param signatures: make_signatures 또는 load_signatures 결과
+    :param k: 기간마다 찾을 과거 이슈 수
+    :param windows: 비교할 기간(시간 수) 리스트
+    :param scale_factor: 거리를 유사도로 바꿀 때 사용하는 스케일
+    :param radius: fastdtw의 radius, None이면 전체 영역 탐색
+    :param min_similarity: 이보다 유사도가 낮은 과거 이슈는 DTW 계산을 건너뛰고 결과에서 제외
+    :param window_signatures: (start, end)별 make_window_signatures 결과를 담아 둘 dict
+        같은 길이의 그래프를 여러 번 검색할 때 같은 dict를 넘기면 과거 이슈 구간은 기간마다 한 번만 만듦
+    :return: {"window", "rank", "index", "past_issue_name", "similarity"} dict 리스트, 기간별로 유사도가 높은 순서
+    """
+    if isinstance(series, pd.Series):
+        series = series.to_numpy()
+    series = np.asarray(series, dtype=float)
+
+    # 유사도 = exp(-거리 / scale_factor) 이므로 최소 유사도는 최대 거리로 바꿔 하한 비교에 사용
+    max_distance = -scale_factor * np.log(min_similarity) if min_similarity > 0 else np.inf
+
+    results = []
+    for window in windows or [None]:
+        if window is None:
+            # 전체 그래프와 전체 과거 이슈 비교 (batch_dtw_similarity_score와 같은 비교), 미리 만든 테이블 사용
+            query = to_sparse_points(series)
+            candidates, tables = signatures["points"], signatures["tables"]
+        else:
+            start = max(len(series) - window, 0)
+            query = to_sparse_points(series[start:])
+            if window_signatures is None:
+                window_signatures = {}
+            if (start, len(series)) not in window_signatures:
+                window_signatures[start, len(series)] = make_window_signatures(signatures, start, len(series))
+            prepared = window_signatures[start, len(series)]
+            candidates, tables = prepared["points"], prepared["tables"]
+
+        indices, distances, _ = dtw_top_k(query, candidates, k=k, radius=radius, candidate_tables=tables, max_distance=max_distance)
+
+        for rank, (index, distance) in enumerate(zip(indices, distances), start=1):
+            similarity = float(np.exp(-distance / scale_factor))
+            if similarity < min_similarity or (min_similarity > 0 and not np.isfinite(distance)):
+                continue
+            results.append(
+                {
+                    "window": window or len(series),
+                    "rank": rank,
+                    "index": int(index),
+                    "past_issue_name": signatures["names"][index],
+                    "similarity": similarity,
+                }
+            )
+
+    return results
+
+
+# 시그니처 저장 형식이 바뀌면 올려서 이전 파일을 다시 만들도록 함
+SIGNATURE_VERSION = 1
+
+
+def make_signatures(names: list, series_list: list) -> dict:
+    """
+    과거 이슈처럼 자주 바뀌지 않는 그래프들의 DTW 전처리 결과를 한 번에 계산
+    :param names: 그래프 이름 리스트
+    :param series_list: 그래프 리스트 (pd.Series, np.ndarray, list)
+    :return: names, lengths(원래 길이), points(to_sparse_points), tables(make_range_tables)를 담은 dict
+    """
+    points = [to_sparse_points(series) for series in series_list]
+
+    return {
+        "names": list(names),
+        "lengths": [len(series) for series in series_list],
+        "points": points,
+        "tables": [make_range_tables(p) for p in points],
+    }
+
+
+def save_signatures(signatures: dict, file, fingerprint: str = "") -> None:
+    """
+    make_signatures 결과를 npz로 저장 (pickle 없이 읽을 수 있는 배열만 사용)
+    :param signatures: make_signatures 결과
+    :param file: 파일 경로 또는 파일 객체
+    :param fingerprint: 시그니처를 만든 원본 데이터를 나타내는 문자열, load_signatures 결과와 비교해 재사용 여부 판단
+    """
+    arrays = {
+        "version": np.array(SIGNATURE_VERSION),
+        "fingerprint": np.array(fingerprint),
+        "names": np.array(signatures["names"], dtype=str),
+        "lengths": np.array(signatures["lengths"], dtype=np.int64),
+    }
+    for k, (points, (mins, maxs)) in enumerate(zip(signatures["points"], signatures["tables"])):
+        arrays[f"points_{k}"] = points
+        arrays[f"mins_{k}"] = mins
+        arrays[f"maxs_{k}"] = maxs
+
+    np.savez_compressed(file, **arrays)
+
+
+def load_signatures(file) -> dict:
+    """
+    save_signatures로 저장한 시그니처 읽기
+    :param file: 파일 경로 또는 파일 객체
+    :return: make_signatures 결과에 version, fingerprint를 더한 dict
+    """
+    with np.load(file, allow_pickle=False) as arrays:
+        names = [str(name) for name in arrays["names"]]
+
+        return {
+            "version": int(arrays["version"]),
+            "fingerprint": str(arrays["fingerprint"]),
+            "names": names,
+            "lengths": [int(length) for length in arrays["lengths"]],
+            "points": [arrays[f"points_{k}"] for k in range(len(names))],
+            "tables": [(arrays[f"mins_{k}"], arrays[f"maxs_{k}"]) for k in range(len(names))],
+        }
+
+
 def generate_sparse_time_series(offset=0, length=100, sparsity=0.7, noise_level=0.1):
     # 기본 시계열 생성
     time = np.arange(length)
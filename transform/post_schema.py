@@ -0,0 +1,187 @@
+"""
+게시글 레코드 스키마 정의
+
+formatter -> sentiment -> keywords 단계를 거치며 만들어지는 게시글 JSONL 레코드의 형태를 한곳에서 관리합니다.
+- 각 단계의 서버/람다는 validate_post로 출력 레코드를 검증합니다.
+- EMR은 get_spark_schema로 만든 스키마로 keywords/ 파일을 읽어 스키마 추론을 생략합니다.
+- 키워드 추출 서버는 to_arrow_table로 keywords/ 단계 레코드를 Parquet으로도 저장합니다.
+
+스키마를 바꿀 때는 POST_SCHEMA_VERSION을 올리고 아래 변경 기록을 남겨주세요.
+- 1: formatter 출력 + sentiment + keywords
+"""
+
+import json
+
+
+POST_SCHEMA_VERSION = 1
+
+# 레코드가 만들어지는 단계 (순서대로)
+STAGES = ["formatted", "sentiment", "keywords"]
+
+# 필드 타입
+# - string: 문자열
+# - count: 조회수, 추천수, 댓글수 (커뮤니티에 따라 정수 또는 문자열, EMR에서 정수로 변환)
+# - double: 실수
+# - string_array: 문자열 리스트
+# - json: 커뮤니티마다 형태가 다른 중첩 값 (EMR에서는 JSON 문자열 그대로 읽음)
+FIELD_TYPES = ["string", "count", "double", "string_array", "json"]
+
+# (필드 이름, 타입, 추가되는 단계, null 허용 여부)
+POST_FIELDS = [
+    ("title", "string", "formatted", False),
+    ("content", "string", "formatted", False),
+    ("author", "string", "formatted", True),
+    ("created_at", "string", "formatted", False),
+    ("viewed", "count", "formatted", True),
+    ("liked", "count", "formatted", True),
+    ("num_of_comments", "count", "formatted", True),
+    ("comments", "json", "formatted", True),
+    ("model", "string", "formatted", False),
+    ("data_source", "string", "formatted", False),
+    ("url", "string", "formatted", False),
+    ("sentiment", "double", "sentiment", False),
+    ("keywords", "string_array", "keywords", False),
+]
+
+
+def get_stage_fields(stage: str) -> list:
+    """
+    해당 단계까지 레코드에 있어야 하는 필드 목록
+    :param stage: STAGES 중 하나
+    :return: (필드 이름, 타입, 추가되는 단계, null 허용 여부) 리스트
+    """
+    if stage not in STAGES:
+        raise ValueError(f"Cannot use stage '{stage}'")
+
+    stage_index = STAGES.index(stage)
+
+    return [field for field in POST_FIELDS if STAGES.index(field[2]) <= stage_index]
+
+
+def _is_valid_type(value, field_type: str) -> bool:
+    if field_type == "string":
+        return isinstance(value, str)
+    elif field_type == "count":
+        return isinstance(value, (int, str)) and not isinstance(value, bool)
+    elif field_type == "double":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif field_type == "string_array":
+        return isinstance(value, list) and all(isinstance(v, str) for v in value)
+    elif field_type == "json":
+        return isinstance(value, (list, dict, str))
+    else:
+        raise ValueError(f"Cannot use field type '{field_type}'")
+
+
+def validate_post(post: dict, stage: str) -> None:
+    """
+    게시글 레코드가 해당 단계의 스키마를 따르는지 검증
+    :param post: 게시글 레코드
+    :param stage: STAGES 중 하나
+    :raise ValueError: 필드가 없거나 타입이 맞지 않는 경우
+    """
+    errors = []
+    for name, field_type, _, nullable in get_stage_fields(stage):
+        if name not in post:
+            errors.append(f"missing '{name}'")
+        elif post[name] is None:
+            if not nullable:
+                errors.append(f"'{name}' is null")
+        elif not _is_valid_type(post[name], field_type):
+            errors.append(f"'{name}' is not {field_type} ({type(post[name]).__name__})")
+
+    if errors:
+        raise ValueError(
+            f"Post does not match schema v{POST_SCHEMA_VERSION} ({stage}): "
+            + ", ".join(errors)
+        )
+
+
+def get_arrow_schema(stage: str = "keywords", exclude: tuple = ()):
+    """
+    해당 단계 레코드를 Parquet으로 저장하기 위한 Arrow 스키마
+    count, json 필드는 get_spark_schema와 같이 문자열로 저장
+    :param stage: STAGES 중 하나
+    :param exclude: 제외할 필드 (파티션 컬럼 등)
+    :return: pyarrow Schema
+    """
+    # pyarrow는 Parquet을 저장하는 서버에서만 필요하므로 사용할 때 import
+    import pyarrow as pa
+
+    arrow_types = {
+        "string": pa.string(),
+        "count": pa.string(),
+        "double": pa.float64(),
+        "string_array": pa.list_(pa.string()),
+        "json": pa.string(),
+    }
+
+    return pa.schema(
+        [
+            pa.field(name, arrow_types[field_type], nullable)
+            for name, field_type, _, nullable in get_stage_fields(stage)
+            if name not in exclude
+        ]
+    )
+
+
+def to_arrow_table(posts: list, stage: str = "keywords", exclude: tuple = ()):
+    """
+    게시글 레코드 리스트를 Arrow 테이블로 변환
+    :param posts: validate_post를 통과한 게시글 레코드 리스트
+    :param stage: STAGES 중 하나
+    :param exclude: 제외할 필드 (파티션 컬럼 등)
+    :return: pyarrow Table
+    """
+    import pyarrow as pa
+
+    schema = get_arrow_schema(stage, exclude)
+    field_types = {name: field_type for name, field_type, _, _ in POST_FIELDS}
+
+    columns = {}
+    for name in schema.names:
+        values = [post.get(name) for post in posts]
+        if field_types[name] == "count":
+            values = [None if v is None else str(v) for v in values]
+        elif field_types[name] == "json":
+            values = [
+                v if v is None or isinstance(v, str) else json.dumps(v, ensure_ascii=False)
+                for v in values
+            ]
+        columns[name] = values
+
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def get_spark_schema(stage: str = "keywords", exclude: tuple = ()):
+    """
+    해당 단계 레코드를 읽기 위한 Spark 스키마
+    count, json 필드는 문자열로 읽고 이후 단계에서 변환
+    :param stage: STAGES 중 하나
+    :param exclude: 제외할 필드
+    :return: pyspark StructType
+    """
+    # pyspark는 EMR에서만 필요하므로 사용할 때 import
+    from pyspark.sql.types import (
+        ArrayType,
+        DoubleType,
+        StringType,
+        StructField,
+        StructType,
+    )
+
+    spark_types = {
+        "string": StringType(),
+        "count": StringType(),
+        "double": DoubleType(),
+        "string_array": ArrayType(StringType()),
+        "json": StringType(),
+    }
+
+    return StructType(
+        [
+            StructField(name, spark_types[field_type], nullable)
+            for name, field_type, _, nullable in get_stage_fields(stage)
+            if name not in exclude
+        ]
+    )